@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Check with EXPLAIN that the queries behind ddl/indexes use their index.
+
+Each probe is a typical lookup for one index. A value for its filter column
+is sampled from the loaded data, the query is explained with that value, and
+the plan tree is searched for the expected index name. Run it after the seeds
+are loaded and analyzed; on very small tables the planner rightly prefers a
+sequential scan, so --disable-seqscan only checks that the index is usable.
+
+Example usage:
+    python3 check-sql-indexes.py --disable-seqscan
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import psycopg
+from psycopg import sql
+
+
+# index name, table, sampled column (None: no parameter), query with {} for the sampled value
+PROBES = [
+    ("idx_anime_genre_genre_id", "anime_genre", "genre_id", "SELECT anime_id FROM anime_genre WHERE genre_id = {}"),
+    (
+        "idx_anime_explicit_genre_explicit_genre_id",
+        "anime_explicit_genre",
+        "explicit_genre_id",
+        "SELECT anime_id FROM anime_explicit_genre WHERE explicit_genre_id = {}",
+    ),
+    (
+        "idx_anime_licensor_licensor_id",
+        "anime_licensor",
+        "licensor_id",
+        "SELECT anime_id FROM anime_licensor WHERE licensor_id = {}",
+    ),
+    (
+        "idx_anime_demographic_demographic_id",
+        "anime_demographic",
+        "demographic_id",
+        "SELECT anime_id FROM anime_demographic WHERE demographic_id = {}",
+    ),
+    (
+        "idx_anime_producer_producer_id",
+        "anime_producer",
+        "producer_id",
+        "SELECT anime_id FROM anime_producer WHERE producer_id = {}",
+    ),
+    (
+        "idx_anime_streaming_service_streaming_service_id",
+        "anime_streaming_service",
+        "streaming_service_id",
+        "SELECT anime_id FROM anime_streaming_service WHERE streaming_service_id = {}",
+    ),
+    ("idx_anime_studio_studio_id", "anime_studio", "studio_id", "SELECT anime_id FROM anime_studio WHERE studio_id = {}"),
+    ("idx_anime_theme_theme_id", "anime_theme", "theme_id", "SELECT anime_id FROM anime_theme WHERE theme_id = {}"),
+    (
+        "idx_character_anime_work_character_id",
+        "character_anime_work",
+        "character_id",
+        "SELECT anime_id, character_role_id FROM character_anime_work WHERE character_id = {}",
+    ),
+    (
+        "idx_person_anime_work_person_id",
+        "person_anime_work",
+        "person_id",
+        "SELECT anime_id FROM person_anime_work WHERE person_id = {}",
+    ),
+    (
+        "idx_person_voice_work_anime_id",
+        "person_voice_work",
+        "anime_id",
+        "SELECT person_id, character_id FROM person_voice_work WHERE anime_id = {}",
+    ),
+    (
+        "idx_person_voice_work_character_id",
+        "person_voice_work",
+        "character_id",
+        "SELECT person_id, anime_id FROM person_voice_work WHERE character_id = {}",
+    ),
+    (
+        "idx_anime_recommendation_recommended_anime_id",
+        "anime_recommendation",
+        "recommended_anime_id",
+        "SELECT anime_id FROM anime_recommendation WHERE recommended_anime_id = {}",
+    ),
+    ("idx_anime_season_id", "anime", "season_id", "SELECT id, title FROM anime WHERE season_id = {}"),
+    ("idx_anime_year", "anime", "year", "SELECT id, title FROM anime WHERE year = {}"),
+    ("idx_anime_score", "anime", None, "SELECT id, title, score FROM anime ORDER BY score DESC LIMIT 20"),
+    ("idx_app_user_username", "app_user", "username", "SELECT id FROM app_user WHERE username = {}"),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN the typical lookups of ddl/indexes and check that each one uses its index."
+    )
+    parser.add_argument(
+        "connection_string",
+        nargs="?",
+        help="PostgreSQL connection string. Falls back to SQL_DATABASE_URL if omitted.",
+    )
+    parser.add_argument(
+        "--disable-seqscan",
+        action="store_true",
+        help="Run EXPLAIN with enable_seqscan = off, to check the indexes are usable on small test data.",
+    )
+    return parser.parse_args()
+
+
+def load_env_variables() -> None:
+    env_path = Path(__file__).resolve().parent / ".env.local"
+    if env_path.exists():
+        with env_path.open(encoding="utf-8") as env_file:
+            for line in env_file:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                key, sep, value = line.partition("=")
+                if sep:
+                    os.environ[key.strip()] = os.path.expandvars(value.strip())
+
+
+def resolve_connection_string(connection_string: str | None) -> str:
+    if connection_string:
+        return connection_string
+    database_url = os.getenv("SQL_DATABASE_URL")
+    if database_url:
+        return database_url
+    raise ValueError("Missing connection string. Pass it as an argument or set SQL_DATABASE_URL.")
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def check_probe(
+    cursor: psycopg.Cursor,
+    index_name: str,
+    table: str,
+    column: str | None,
+    query: str,
+) -> tuple[str, str]:
+    """Return (status, detail) for one probe: OK, FAIL or SKIP."""
+    cursor.execute(
+        "SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() AND indexname = %s",
+        (index_name,),
+    )
+    if cursor.fetchone() is None:
+        return "FAIL", "index does not exist"
+
+    value: object = None
+    if column is not None:
+        cursor.execute(
+            sql.SQL("SELECT {} FROM {} WHERE {} IS NOT NULL LIMIT 1").format(
+                sql.Identifier(column), sql.Identifier(table), sql.Identifier(column)
+            )
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return "SKIP", f"{table} has no rows to sample"
+        value = row[0]
+
+    statement = sql.SQL(query).format(sql.Literal(value)) if column is not None else sql.SQL(query)
+    cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) {}").format(statement))
+    plan = cursor.fetchone()[0][0]["Plan"]
+    nodes = plan_nodes(plan)
+    if any(node.get("Index Name") == index_name for node in nodes):
+        return "OK", nodes[0]["Node Type"]
+    scans = ", ".join(
+        f"{node['Node Type']} on {node.get('Relation Name', '?')}" for node in nodes if "Relation Name" in node
+    )
+    return "FAIL", f"plan uses {scans or nodes[0]['Node Type']}"
+
+
+def main() -> int:
+    args = parse_args()
+    load_env_variables()
+    try:
+        connection_string = resolve_connection_string(args.connection_string)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    counts = {"OK": 0, "FAIL": 0, "SKIP": 0}
+    with psycopg.connect(connection_string) as connection:
+        with connection.cursor() as cursor:
+            if args.disable_seqscan:
+                cursor.execute("SET enable_seqscan = off")
+            for index_name, table, column, query in PROBES:
+                status, detail = check_probe(cursor, index_name, table, column, query)
+                counts[status] += 1
+                print(f"{status:<4} {index_name}: {detail}")
+        connection.rollback()
+
+    if counts["FAIL"]:
+        print(f"Error: {counts['FAIL']} of {len(PROBES)} lookups do not use their index", file=sys.stderr)
+        return 1
+    print(f"Index check passed ({counts['OK']} OK, {counts['SKIP']} skipped).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
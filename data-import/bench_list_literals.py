@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark list_literals.parse_list_literal against json/ast parsing.
+
+Every list cell of the selected CSV columns (plus a fixed set of known cell
+shapes) is parsed with both the fast parser and the previous
+json.loads -> ast.literal_eval chain. The script fails if any cell produces a
+different result, then reports the timing of both parsers.
+
+Example usage:
+    python data-import/bench_list_literals.py \
+        --csv-path data-import/datasets/details.csv \
+        --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from list_literals import parse_list_literal
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LIST_COLUMNS = "genres,explicit_genres,licensors,demographics,producers,streaming,studios,themes"
+
+# Cell shapes seen in the datasets, plus the edge cases that must take the
+# json/ast fallback.
+SAMPLE_CELLS = [
+    "[]",
+    "[ ]",
+    "['Action']",
+    "['Action', 'Drama']",
+    "['Action','Drama']",
+    '["Action", "Drama"]',
+    '["Girls\' Love"]',
+    "['Say \"Hi\" Co']",
+    "['O\\'Brien, Inc.']",
+    '["Bandai\\\\Visual"]',
+    '["\\u30c9\\u30ef\\u30f3\\u30b4"]',
+    "['ドワンゴ', 'TV Tokyo']",
+    "['  padded  ', '']",
+    "['trailing',]",
+    "['implicit' 'concat']",
+    "[1, 2]",
+    "[['nested']]",
+    "['unterminated",
+    "[not a list]",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check and time the fast list-literal parser on real dataset cells."
+    )
+    parser.add_argument(
+        "--csv-path",
+        default=str(ROOT / "data-import" / "datasets" / "details.csv"),
+        help="CSV file to take list cells from (default: data-import/datasets/details.csv).",
+    )
+    parser.add_argument(
+        "--columns",
+        default=LIST_COLUMNS,
+        help="Comma-separated list columns to read (default: the details.csv list columns).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs per parser; the best one is reported (default: 3).",
+    )
+    return parser.parse_args()
+
+
+def reference_parse(text: str) -> list[object] | None:
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, list):
+        return parsed
+    try:
+        parsed = ast.literal_eval(text)
+    except (SyntaxError, ValueError):
+        return None
+    if isinstance(parsed, list):
+        return parsed
+    return None
+
+
+def read_cells(csv_path: Path, columns: list[str]) -> list[str]:
+    cells: list[str] = []
+    with csv_path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.DictReader(handle)
+        missing = [column for column in columns if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing columns in CSV: {', '.join(missing)}")
+        for row in reader:
+            for column in columns:
+                text = (row.get(column) or "").strip()
+                if text.startswith("["):
+                    cells.append(text)
+    return cells
+
+
+def best_time(parse, cells: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in cells:
+            parse(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    args = parse_args()
+    columns = [col.strip() for col in args.columns.split(",") if col.strip()]
+
+    cells = list(SAMPLE_CELLS)
+    csv_path = Path(args.csv_path)
+    if csv_path.exists():
+        try:
+            cells.extend(read_cells(csv_path, columns))
+        except ValueError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+    else:
+        print(f"Warning: {csv_path} not found; using built-in sample cells only", file=sys.stderr)
+
+    mismatches = 0
+    for text in cells:
+        expected = reference_parse(text)
+        actual = parse_list_literal(text)
+        if actual != expected or type(actual) is not type(expected):
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"Mismatch for {text!r}: expected {expected!r}, got {actual!r}", file=sys.stderr)
+    if mismatches:
+        print(f"Error: {mismatches} of {len(cells)} cells parsed differently", file=sys.stderr)
+        return 1
+    print(f"Verified {len(cells)} cells: fast parser output matches json/ast parsing")
+
+    repeat = max(1, args.repeat)
+    reference_seconds = best_time(reference_parse, cells, repeat)
+    fast_seconds = best_time(parse_list_literal, cells, repeat)
+    print(f"json/ast parsing:   {reference_seconds:.4f}s")
+    print(f"parse_list_literal: {fast_seconds:.4f}s")
+    if fast_seconds > 0:
+        print(f"Speedup: {reference_seconds / fast_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,330 @@
+"""Columnar (Parquet) cache of the raw dataset CSVs.
+
+generate_dataset_cache.py converts each CSV in data-import/datasets once; the
+seed generators then open datasets through open_dataset(), which reads only
+the requested columns from the cache and skips CSV parsing entirely.
+
+Cache entries live in data-import/cache as <stem>.parquet plus a <stem>.json
+metadata file holding the source size, mtime and SHA-256. An entry is used
+only while the source CSV still matches it; otherwise readers silently fall
+back to the CSV. Columns whose non-empty cells are all canonical integers are
+stored as int64, every other column as text. Rows are handed back as the same
+strings csv.DictReader would produce, so every generator keeps its own
+parse_int/parse_float/parse_date rules and its output does not change.
+
+pyarrow is optional: without it the cache cannot be built and every read
+goes to the CSV.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from tqdm import tqdm
+
+from read_progress import track_read_progress
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pc = None
+    pq = None
+
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
+CACHE_VERSION = 1
+BATCH_ROWS = 65536
+
+# Integers that round-trip through int() and str() unchanged and fit in int64.
+_CANONICAL_INT_RE = re.compile(r"0|-?[1-9][0-9]{0,17}")
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+def cache_paths(csv_path: Path, cache_dir: Path = CACHE_DIR) -> tuple[Path, Path]:
+    return cache_dir / f"{csv_path.stem}.parquet", cache_dir / f"{csv_path.stem}.json"
+
+
+def write_meta(meta_path: Path, meta: dict[str, Any]) -> None:
+    # Written beside the target and renamed so readers never see a partial file.
+    tmp_path = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, meta_path)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache_entry(
+    csv_path: Path,
+    encoding: str = "utf-8",
+    cache_dir: Path = CACHE_DIR,
+) -> dict[str, Any] | None:
+    """Return the metadata of an up-to-date cache entry for csv_path, else None."""
+    if not pyarrow_available():
+        return None
+    parquet_path, meta_path = cache_paths(csv_path, cache_dir)
+    if not parquet_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION or meta.get("encoding") != encoding:
+        return None
+
+    stat = csv_path.stat()
+    if stat.st_size != meta.get("size"):
+        return None
+    if stat.st_mtime_ns == meta.get("mtime_ns"):
+        return meta
+
+    # Touched but possibly unchanged (e.g. re-downloaded): fall back to the hash.
+    if file_sha256(csv_path) != meta.get("sha256"):
+        return None
+    meta["mtime_ns"] = stat.st_mtime_ns
+    write_meta(meta_path, meta)
+    return meta
+
+
+def detect_int_columns(csv_path: Path, encoding: str, show_progress: bool) -> tuple[list[str], set[int]]:
+    with csv_path.open("r", encoding=encoding, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        candidates = set(range(len(header)))
+        for row in track_read_progress(
+            reader,
+            handle,
+            desc=f"Typing {csv_path.name}",
+            show_progress=show_progress,
+        ):
+            if not candidates:
+                break
+            row_len = len(row)
+            for index in list(candidates):
+                if index < row_len and row[index] and not _CANONICAL_INT_RE.fullmatch(row[index]):
+                    candidates.discard(index)
+    return header, candidates
+
+
+def build_cache_entry(
+    csv_path: Path,
+    encoding: str = "utf-8",
+    cache_dir: Path = CACHE_DIR,
+    show_progress: bool = True,
+) -> dict[str, Any]:
+    """Convert csv_path into a Parquet cache entry and return its metadata."""
+    if not pyarrow_available():
+        raise RuntimeError("pyarrow is required to build the dataset cache: pip install pyarrow")
+
+    header, int_columns = detect_int_columns(csv_path, encoding, show_progress)
+    if len(set(header)) != len(header):
+        raise ValueError(f"Duplicate column names in {csv_path}")
+
+    schema = pa.schema(
+        [pa.field(name, pa.int64() if index in int_columns else pa.string()) for index, name in enumerate(header)]
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    parquet_path, meta_path = cache_paths(csv_path, cache_dir)
+    tmp_path = parquet_path.with_suffix(".parquet.tmp")
+    stat = csv_path.stat()
+
+    row_count = 0
+    columns: list[list[object]] = [[] for _ in header]
+
+    def flush(writer: Any) -> None:
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        for values in columns:
+            values.clear()
+
+    with csv_path.open("r", encoding=encoding, newline="") as handle, pq.ParquetWriter(
+        tmp_path, schema, compression="zstd"
+    ) as writer:
+        reader = csv.reader(handle)
+        next(reader, None)
+        width = len(header)
+        for row in track_read_progress(
+            reader,
+            handle,
+            desc=f"Caching {csv_path.name}",
+            show_progress=show_progress,
+        ):
+            if not row:
+                continue  # csv.DictReader skips blank lines too
+            row_len = len(row)
+            for index in range(width):
+                if index >= row_len:
+                    columns[index].append(None)
+                elif index in int_columns:
+                    columns[index].append(int(row[index]) if row[index] else None)
+                else:
+                    columns[index].append(row[index])
+            row_count += 1
+            if len(columns[0]) >= BATCH_ROWS:
+                flush(writer)
+        if columns and columns[0]:
+            flush(writer)
+
+    os.replace(tmp_path, parquet_path)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": csv_path.name,
+        "encoding": encoding,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(csv_path),
+        "rows": row_count,
+        "columns": header,
+        "int_columns": [header[index] for index in sorted(int_columns)],
+    }
+    write_meta(meta_path, meta)
+    return meta
+
+
+class DatasetReader:
+    """Iterate the rows of a dataset CSV as dicts, from the cache when it is fresh.
+
+    Use through open_dataset(). fieldnames always lists every column of the
+    source file; rows read from the cache contain only the requested columns.
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        columns: Iterable[str] | None = None,
+        desc: str | None = None,
+        show_progress: bool = True,
+        encoding: str = "utf-8",
+        cache_dir: Path = CACHE_DIR,
+        position: int | None = None,
+    ) -> None:
+        self.csv_path = csv_path
+        self.columns = None if columns is None else list(columns)
+        self.desc = desc
+        self.show_progress = show_progress
+        self.encoding = encoding
+        self.position = position
+        self.cache_dir = cache_dir
+        self.fieldnames: list[str] = []
+        self.cached = False
+        self._meta: dict[str, Any] | None = None
+        self._handle: Any = None
+        self._reader: csv.DictReader | None = None
+
+    def __enter__(self) -> DatasetReader:
+        self._meta = load_cache_entry(self.csv_path, self.encoding, self.cache_dir)
+        if self._meta is not None:
+            self.cached = True
+            self.fieldnames = list(self._meta["columns"])
+            return self
+
+        self._handle = self.csv_path.open("r", encoding=self.encoding, newline="")
+        self._reader = csv.DictReader(self._handle)
+        self.fieldnames = list(self._reader.fieldnames or [])
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __iter__(self) -> Iterator[dict[str, str | None]]:
+        if self._reader is not None:
+            yield from track_read_progress(
+                self._reader, self._handle, self.desc, self.show_progress, self.position
+            )
+            return
+        if self._meta is None:
+            raise RuntimeError("DatasetReader must be used as a context manager")
+
+        wanted = self.fieldnames if self.columns is None else [c for c in self.fieldnames if c in self.columns]
+        int_columns = set(self._meta.get("int_columns", []))
+        parquet_path, _ = cache_paths(self.csv_path, self.cache_dir)
+        parquet_file = pq.ParquetFile(parquet_path)
+        with tqdm(
+            total=parquet_file.metadata.num_rows,
+            desc=self.desc,
+            unit="row",
+            disable=not self.show_progress,
+            position=self.position,
+        ) as progress_bar:
+            for batch in parquet_file.iter_batches(batch_size=BATCH_ROWS, columns=wanted):
+                values = []
+                for name, column in zip(batch.schema.names, batch.columns):
+                    if name in int_columns:
+                        column = pc.fill_null(pc.cast(column, pa.string()), "")
+                    values.append(column.to_pylist())
+                for row_values in zip(*values):
+                    yield dict(zip(wanted, row_values))
+                progress_bar.update(batch.num_rows)
+
+
+def open_dataset(
+    csv_path: Path,
+    columns: Iterable[str] | None = None,
+    desc: str | None = None,
+    show_progress: bool = True,
+    encoding: str = "utf-8",
+    position: int | None = None,
+) -> DatasetReader:
+    """Open a dataset CSV for row iteration, projecting columns when cached."""
+    return DatasetReader(
+        csv_path,
+        columns,
+        desc=desc,
+        show_progress=show_progress,
+        encoding=encoding,
+        position=position,
+    )
+
+
+def read_dataset_frame(csv_path: Path, columns: Iterable[str], encoding: str = "utf-8") -> Any:
+    """Load the given columns of a dataset as a pandas DataFrame of str/None cells.
+
+    Cells match what open_dataset() yields. Columns missing from the file are
+    simply absent from the frame. Requires pandas.
+    """
+    import pandas as pd
+
+    wanted = list(columns)
+    meta = load_cache_entry(csv_path, encoding)
+    if meta is not None:
+        selected = [column for column in meta["columns"] if column in wanted]
+        int_columns = set(meta.get("int_columns", []))
+        table = pq.read_table(cache_paths(csv_path)[0], columns=selected)
+        arrays = [
+            pc.fill_null(pc.cast(table[name], pa.string()), "") if name in int_columns else table[name]
+            for name in selected
+        ]
+        data = {name: pd.Series(array.to_pylist(), dtype=object) for name, array in zip(selected, arrays)}
+        return pd.DataFrame(data, columns=selected)
+
+    header = list(pd.read_csv(csv_path, nrows=0, encoding=encoding).columns)
+    selected = [column for column in header if column in wanted]
+    frame = pd.read_csv(
+        csv_path,
+        usecols=selected,
+        dtype=object,
+        encoding=encoding,
+        keep_default_na=False,
+        na_filter=False,
+    )
+    return frame.astype(object).where(frame.notna(), None)
@@ -4,6 +4,18 @@
 If a column value looks like a JSON list (e.g. ["adventure", "drama"]),
 this script will split it and include the individual elements.
 
+By default every requested column is collected in a single streaming pass
+over the CSV; use --strategy per-column to re-read the file once per column.
+When generate_dataset_cache.py has cached the CSV, only the requested columns
+are read from the cache instead.
+
+An existing <column>_distinct.csv is treated as an append-only id registry:
+values it already lists keep their id (even if they are gone from the
+dataset) and only new values are appended after the highest id, so lookup
+tables and junction rows already loaded stay valid. Use --renumber-ids to
+number the sorted values from 1 again. Columns passed with --pool-columns
+(plain value pools such as mal_id, not lookup tables) are always renumbered.
+
 Example usage:
     python distinct_columns.py \
         --csv-path movies.csv \
@@ -12,13 +24,15 @@ Example usage:
 """
 
 import argparse
-import ast
 import csv
-import json
 import os
 import sys
-from typing import Iterable, List, Set
-from tqdm import tqdm
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from dataset_cache import open_dataset
+from list_literals import parse_list_literal
+from lookup_store import read_distinct_csv
 
 
 def parse_args() -> argparse.Namespace:
@@ -45,6 +59,31 @@ def parse_args() -> argparse.Namespace:
         required=True,
         help="Path to the output folder.",
     )
+    parser.add_argument(
+        "--strategy",
+        choices=("single-pass", "per-column"),
+        default="single-pass",
+        help=(
+            "How to scan the CSV: collect all columns in one pass, or re-read "
+            "the file once per column (default: single-pass)."
+        ),
+    )
+    parser.add_argument(
+        "--renumber-ids",
+        action="store_true",
+        help=(
+            "Ignore ids assigned by a previous run and number the sorted values "
+            "from 1 (default: keep existing ids and append new values)."
+        ),
+    )
+    parser.add_argument(
+        "--pool-columns",
+        default="",
+        help=(
+            "Comma-separated columns that are value pools rather than lookup tables: "
+            "always written sorted and numbered from 1, without the id registry."
+        ),
+    )
     parser.add_argument(
         "--progress",
         choices=("linear", "detailed", "off"),
@@ -72,31 +111,19 @@ def try_parse_json_list(raw: str) -> Iterable[str] | None:
         return None
     if not raw.strip().startswith("["):
         return None
-    try:
-        parsed = json.loads(raw)
-    except json.JSONDecodeError:
-        parsed = None
-    if isinstance(parsed, list):
-        return [str(item).strip() for item in parsed if str(item).strip()]
-    try:
-        parsed = ast.literal_eval(raw)
-    except (SyntaxError, ValueError):
+    parsed = parse_list_literal(raw)
+    if parsed is None:
         return None
-    if isinstance(parsed, list):
-        return [str(item).strip() for item in parsed if str(item).strip()]
-    return None
+    return [str(item).strip() for item in parsed if str(item).strip()]
 
 def extract_distinct(csv_path: str, column: str, encoding: str, show_progress: bool) -> List[str]:
     distinct: Set[str] = set()
 
-    with open(csv_path, "r", encoding=encoding, newline="") as handle:
-        total_rows = sum(1 for _ in handle) - 1  # subtract header
-        handle.seek(0)
-        reader = csv.DictReader(handle)
-        if column not in (reader.fieldnames or []):
+    with open_dataset(Path(csv_path), [column], show_progress=show_progress, encoding=encoding) as reader:
+        if column not in reader.fieldnames:
             raise ValueError(f"Missing columns in CSV: {column}")
 
-        for row in tqdm(reader, total=total_rows, disable=not show_progress):
+        for row in reader:
             raw = (row.get(column) or "").strip()
             if not raw:
                 continue
@@ -110,11 +137,71 @@ def extract_distinct(csv_path: str, column: str, encoding: str, show_progress: b
     return sorted(distinct)
 
 
+def extract_distinct_many(
+    csv_path: str,
+    columns: List[str],
+    encoding: str,
+    show_progress: bool,
+) -> Dict[str, List[str]]:
+    """Collect the distinct values of every column in one pass over the CSV."""
+    distinct: Dict[str, Set[str]] = {column: set() for column in columns}
+
+    with open_dataset(Path(csv_path), columns, show_progress=show_progress, encoding=encoding) as reader:
+        missing = [column for column in columns if column not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Missing columns in CSV: {', '.join(missing)}")
+
+        targets = list(distinct.items())
+        for row in reader:
+            for column, values in targets:
+                raw = (row.get(column) or "").strip()
+                if not raw:
+                    continue
+
+                parsed_list = try_parse_json_list(raw)
+                if parsed_list is not None:
+                    values.update(parsed_list)
+                else:
+                    values.add(raw)
+
+    return {column: sorted(values) for column, values in distinct.items()}
+
+
+def assign_ids(values: List[str], registry: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Keep the (id, value) rows of registry and append unseen values after the highest id."""
+    known = {value for _, value in registry}
+    next_id = max((value_id for value_id, _ in registry), default=0) + 1
+    rows = list(registry)
+    for value in values:
+        if value not in known:
+            rows.append((next_id, value))
+            next_id += 1
+    return rows
+
+
+def write_distinct(output_path: str, column: str, values: List[str], renumber_ids: bool = False) -> None:
+    output_file = os.path.join(output_path, f"{column}_distinct.csv")
+    registry: List[Tuple[int, str]] = []
+    if not renumber_ids and os.path.exists(output_file):
+        registry = read_distinct_csv(Path(output_file), show_progress=False)
+    rows = assign_ids(values, registry)
+    if registry:
+        print(f"{column}: kept {len(registry)} ids, appended {len(rows) - len(registry)} new values")
+
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["id", "value"])
+        writer.writerows(rows)
+    os.replace(tmp_file, output_file)
+
+
 def main() -> int:
     args = parse_args()
     show_progress = should_enable_tqdm(args.progress)
 
     columns = parse_columns(args.columns)
+    pool_columns = set(parse_columns(args.pool_columns))
     if not columns:
         print("No columns provided.", file=sys.stderr)
         return 2
@@ -125,6 +212,27 @@ def main() -> int:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
 
+    if args.strategy == "single-pass":
+        try:
+            print(f"\nProcessing columns: {', '.join(columns)}")
+            results = extract_distinct_many(args.csv_path, columns, args.encoding, show_progress)
+        except (OSError, ValueError) as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+
+        for column in columns:
+            try:
+                write_distinct(
+                    args.output_path,
+                    column,
+                    results[column],
+                    args.renumber_ids or column in pool_columns,
+                )
+            except (OSError, ValueError) as exc:
+                print(f"Error: {exc}", file=sys.stderr)
+                return 1
+        return 0
+
     for column in columns:
         try:
             print(f"\nProcessing column: {column}")
@@ -133,14 +241,9 @@ def main() -> int:
             print(f"Error: {exc}", file=sys.stderr)
             return 1
 
-        output_file = os.path.join(args.output_path, f"{column}_distinct.csv")
         try:
-            with open(output_file, "w", encoding="utf-8", newline="") as handle:
-                writer = csv.writer(handle)
-                writer.writerow(["id", "value"])
-                for idx, value in enumerate(values, start=1):
-                    writer.writerow([idx, value])
-        except OSError as exc:
+            write_distinct(args.output_path, column, values, args.renumber_ids or column in pool_columns)
+        except (OSError, ValueError) as exc:
             print(f"Error: {exc}", file=sys.stderr)
             return 1
 
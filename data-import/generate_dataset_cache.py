@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Convert every dataset CSV into the columnar cache read by the seed generators.
+
+Only files whose cache entry is missing or out of date (size, mtime and
+SHA-256 of the source) are converted, so it is cheap to run before every
+pipeline run.
+
+Example usage:
+    python data-import/generate_dataset_cache.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from dataset_cache import CACHE_DIR, build_cache_entry, load_cache_entry, pyarrow_available
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DATASETS_DIR = ROOT / "data-import" / "datasets"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build the Parquet cache of data-import/datasets used by the seed generators."
+    )
+    parser.add_argument(
+        "--datasets-dir",
+        default=str(DATASETS_DIR),
+        help="Directory containing the dataset CSV files (default: data-import/datasets).",
+    )
+    parser.add_argument(
+        "--files",
+        default=None,
+        help="Optional comma-separated CSV file names to convert (default: every *.csv).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild cache entries even when they are up to date.",
+    )
+    parser.add_argument(
+        "--progress",
+        choices=("linear", "detailed", "off"),
+        default="detailed",
+        help="Progress display mode (default: detailed).",
+    )
+    return parser.parse_args()
+
+
+def should_enable_tqdm(mode: str) -> bool:
+    if mode == "off":
+        return False
+    if mode == "linear":
+        return sys.stdout.isatty()
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+    show_progress = should_enable_tqdm(args.progress)
+
+    if not pyarrow_available():
+        print("Error: pyarrow is required to build the dataset cache: pip install pyarrow", file=sys.stderr)
+        return 1
+
+    datasets_dir = Path(args.datasets_dir)
+    if args.files:
+        csv_paths = [datasets_dir / name.strip() for name in args.files.split(",") if name.strip()]
+    else:
+        csv_paths = sorted(datasets_dir.glob("*.csv"))
+    if not csv_paths:
+        print(f"Error: No CSV files found in {datasets_dir}", file=sys.stderr)
+        return 1
+
+    for csv_path in csv_paths:
+        try:
+            if not args.force and load_cache_entry(csv_path) is not None:
+                print(f"Up to date: {csv_path.name}")
+                continue
+            meta = build_cache_entry(csv_path, show_progress=show_progress)
+        except (OSError, ValueError) as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        print(
+            f"Cached {csv_path.name} ({meta['rows']} rows, "
+            f"{len(meta['int_columns'])}/{len(meta['columns'])} integer columns)"
+        )
+
+    print(f"Dataset cache is up to date in {CACHE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
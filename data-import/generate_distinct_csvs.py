@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import os
+import sqlite3
 import subprocess
 import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from tqdm import tqdm
 
+from lookup_store import STORE_PATH, build_lookup_store
+
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -35,6 +40,12 @@ JOBS: list[tuple[str, str, str]] = [
     ),
 ]
 
+# Id pools sampled by generate_main_seeds.py, not lookup tables: renumbered and
+# sorted on every run, so removed anime leave the pool and --seed stays stable.
+POOL_COLUMNS: dict[str, str] = {
+    "data-import/datasets/details.csv": "mal_id",
+}
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -45,12 +56,29 @@ def parse_args() -> argparse.Namespace:
         default="utf-8",
         help="CSV file encoding passed to distinct_columns.py (default: utf-8).",
     )
+    parser.add_argument(
+        "--renumber-ids",
+        action="store_true",
+        help=(
+            "Passed to distinct_columns.py: number every lookup from 1 again instead of "
+            "keeping the ids of the existing *_distinct.csv files."
+        ),
+    )
     parser.add_argument(
         "--progress",
         choices=("linear", "detailed", "off"),
         default="detailed",
         help="Progress display mode (default: detailed).",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=min(len(JOBS), os.cpu_count() or 1),
+        help=(
+            "Number of source CSV files processed at the same time "
+            f"(default: min({len(JOBS)}, CPU count)). Use 1 to run them one after another."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -62,34 +90,44 @@ def should_enable_tqdm(mode: str) -> bool:
     return True
 
 
-def main() -> None:
-    args = parse_args()
-    python = sys.executable
-    script = ROOT / "data-import" / "distinct_columns.py"
+def build_command(
+    script: Path,
+    csv_path: str,
+    columns: str,
+    output_path: str,
+    encoding: str,
+    progress: str,
+    renumber_ids: bool = False,
+) -> list[str]:
+    command = [
+        sys.executable,
+        str(script),
+        "--csv-path",
+        str(ROOT / csv_path),
+        "--columns",
+        columns,
+        "--encoding",
+        encoding,
+        "--output-path",
+        str(ROOT / output_path),
+        "--progress",
+        progress,
+    ]
+    if csv_path in POOL_COLUMNS:
+        command.extend(["--pool-columns", POOL_COLUMNS[csv_path]])
+    if renumber_ids:
+        command.append("--renumber-ids")
+    return command
 
-    if not script.exists():
-        raise SystemExit(f"Missing script: {script}")
 
+def run_sequential(script: Path, encoding: str, progress: str, renumber_ids: bool) -> None:
     for csv_path, columns, output_path in tqdm(
         JOBS,
         desc="Generating distinct CSV groups",
         unit="group",
-        disable=not should_enable_tqdm(args.progress),
+        disable=not should_enable_tqdm(progress),
     ):
-        command = [
-            python,
-            str(script),
-            "--csv-path",
-            str(ROOT / csv_path),
-            "--columns",
-            columns,
-            "--encoding",
-            args.encoding,
-            "--output-path",
-            str(ROOT / output_path),
-            "--progress",
-            args.progress,
-        ]
+        command = build_command(script, csv_path, columns, output_path, encoding, progress, renumber_ids)
         print("$ " + " ".join(command))
         try:
             subprocess.run(command, cwd=ROOT, check=True)
@@ -98,8 +136,82 @@ def main() -> None:
                 f"Failed generating distinct CSVs for {csv_path} (exit code {exc.returncode})"
             ) from exc
 
+
+def run_parallel(script: Path, encoding: str, progress: str, jobs: int, renumber_ids: bool) -> None:
+    # Child progress bars would overwrite each other on a shared terminal, so
+    # children run quietly and their captured output is printed as one block
+    # per group once it finishes.
+    commands = {
+        csv_path: build_command(script, csv_path, columns, output_path, encoding, "off", renumber_ids)
+        for csv_path, columns, output_path in JOBS
+    }
+    for command in commands.values():
+        print("$ " + " ".join(command))
+
+    failure: tuple[str, subprocess.CompletedProcess[str]] | None = None
+    with ThreadPoolExecutor(max_workers=jobs) as executor, tqdm(
+        total=len(commands),
+        desc="Generating distinct CSV groups",
+        unit="group",
+        disable=not should_enable_tqdm(progress),
+    ) as progress_bar:
+        pending: dict[Future[subprocess.CompletedProcess[str]], str] = {
+            executor.submit(
+                subprocess.run,
+                command,
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+            ): csv_path
+            for csv_path, command in commands.items()
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                csv_path = pending.pop(future)
+                if future.cancelled():
+                    continue
+                result = future.result()
+                if result.stdout:
+                    tqdm.write(f"[{csv_path}]\n{result.stdout.strip()}")
+                if result.stderr:
+                    tqdm.write(f"[{csv_path}]\n{result.stderr.strip()}", file=sys.stderr)
+                progress_bar.update(1)
+
+                if result.returncode != 0 and failure is None:
+                    failure = (csv_path, result)
+                    for other in pending:
+                        other.cancel()
+
+    if failure is not None:
+        csv_path, result = failure
+        raise SystemExit(
+            f"Failed generating distinct CSVs for {csv_path} (exit code {result.returncode})"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    script = ROOT / "data-import" / "distinct_columns.py"
+
+    if not script.exists():
+        raise SystemExit(f"Missing script: {script}")
+    if args.jobs <= 0:
+        raise SystemExit("--jobs must be greater than 0")
+
+    if args.jobs == 1:
+        run_sequential(script, args.encoding, args.progress, args.renumber_ids)
+    else:
+        run_parallel(script, args.encoding, args.progress, args.jobs, args.renumber_ids)
+
     print("All required distinct CSV files were generated successfully.")
 
+    try:
+        lookup_count = build_lookup_store(show_progress=should_enable_tqdm(args.progress))
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        raise SystemExit(f"Failed building the lookup store: {exc}") from exc
+    print(f"Wrote {STORE_PATH.relative_to(ROOT)} ({lookup_count} lookups)")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Index the user-keyed dataset CSVs by username for generate_document_seeds.py.
+
+ratings.csv, favs.csv and profiles.csv are copied into data-import/cache/
+user_index.sqlite clustered by username, so document generation seeks to the
+rows of the selected users instead of scanning every file. Only files whose
+index is missing or out of date (size and mtime of the source) are rebuilt.
+Run generate_dataset_cache.py first to make the one-time build faster.
+
+Example usage:
+    python data-import/generate_user_index.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from user_index import INDEX_PATH, build_user_index, index_is_fresh
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DATASETS_DIR = ROOT / "data-import" / "datasets"
+USER_KEYED_FILES = ("ratings.csv", "favs.csv", "profiles.csv")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build the per-username index of ratings, favs and profiles used by generate_document_seeds.py."
+    )
+    parser.add_argument(
+        "--datasets-dir",
+        default=str(DATASETS_DIR),
+        help="Directory containing the dataset CSV files (default: data-import/datasets).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild index tables even when they are up to date.",
+    )
+    parser.add_argument(
+        "--progress",
+        choices=("linear", "detailed", "off"),
+        default="detailed",
+        help="Progress display mode (default: detailed).",
+    )
+    return parser.parse_args()
+
+
+def should_enable_tqdm(mode: str) -> bool:
+    if mode == "off":
+        return False
+    if mode == "linear":
+        return sys.stdout.isatty()
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+    show_progress = should_enable_tqdm(args.progress)
+    datasets_dir = Path(args.datasets_dir)
+
+    for name in USER_KEYED_FILES:
+        csv_path = datasets_dir / name
+        try:
+            if not args.force and index_is_fresh(csv_path):
+                print(f"Up to date: {name}")
+                continue
+            row_count = build_user_index(csv_path, show_progress=show_progress)
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        print(f"Indexed {name} ({row_count} rows)")
+
+    print(f"User index is up to date in {INDEX_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+"""Parse the list literals stored in dataset cells.
+
+List columns (genres, producers, studios, ...) hold either JSON lists
+(["Action", "Drama"]) or Python reprs (['Action', 'Drama']). Both shapes are
+plain lists of quoted strings, so they are matched with a regular expression
+first; anything else falls back to json.loads and then ast.literal_eval, which
+keeps the result identical to parsing every cell with those two functions.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import re
+
+
+# A quoted item without backslashes or control characters reads the same under
+# JSON and Python rules, so its value is simply the text between the quotes.
+_ITEM = r"""(?:'[^'\\\x00-\x1f]*'|"[^"\\\x00-\x1f]*")"""
+_SIMPLE_LIST_RE = re.compile(rf"\[[ \t]*(?:{_ITEM}(?:[ \t]*,[ \t]*{_ITEM})*)?[ \t]*\]")
+_ITEM_RE = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+
+
+def parse_list_literal(text: str) -> list[object] | None:
+    """Return the items of a JSON or Python list literal, or None if text is not one."""
+    if _SIMPLE_LIST_RE.fullmatch(text):
+        return [single or double for single, double in _ITEM_RE.findall(text)]
+
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, list):
+        return parsed
+
+    try:
+        parsed = ast.literal_eval(text)
+    except (SyntaxError, ValueError):
+        return None
+    if isinstance(parsed, list):
+        return parsed
+    return None
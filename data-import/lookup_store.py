@@ -0,0 +1,189 @@
+"""Indexed SQLite store of the *_distinct.csv lookup tables.
+
+generate_distinct_csvs.py builds data-import/output/lookups.sqlite once all
+distinct CSVs are written. Every lookup is stored under its name, the CSV
+path relative to data-import/output without the "_distinct.csv" suffix (for
+example "details/genres"), as (position, id, value) rows clustered by name,
+so reading one lookup is a single index range scan and opening the store
+parses nothing.
+
+The store records the size and mtime of each source CSV. A lookup is read
+from the store only while its CSV still matches; otherwise (or when there is
+no store at all) it is parsed from the CSV, so a re-generated or hand-edited
+CSV is never shadowed by a stale store. Both paths yield the same rows in
+CSV order, so the seed generators produce the same output either way.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any
+
+from read_progress import track_read_progress
+
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+STORE_PATH = OUTPUT_DIR / "lookups.sqlite"
+STORE_VERSION = 1
+DISTINCT_SUFFIX = "_distinct.csv"
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE source (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE lookup (
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, position)
+) WITHOUT ROWID;
+"""
+
+
+def lookup_csv_path(name: str, output_dir: Path = OUTPUT_DIR) -> Path:
+    return output_dir / f"{name}{DISTINCT_SUFFIX}"
+
+
+def read_distinct_csv(csv_path: Path, show_progress: bool = True) -> list[tuple[int, str]]:
+    """Parse a distinct CSV into (id, value) rows, skipping rows with an empty cell."""
+    rows: list[tuple[int, str]] = []
+    with csv_path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.DictReader(handle)
+        required = {"id", "value"}
+        headers = set(reader.fieldnames or [])
+        if not required.issubset(headers):
+            raise ValueError(f"Lookup CSV must contain columns {sorted(required)}: {csv_path}")
+
+        for row in track_read_progress(
+            reader,
+            handle,
+            desc=f"Reading {csv_path.name}",
+            show_progress=show_progress,
+        ):
+            raw_id = (row.get("id") or "").strip()
+            raw_value = (row.get("value") or "").strip()
+            if not raw_id or not raw_value:
+                continue
+            try:
+                value_id = int(raw_id)
+            except ValueError as exc:
+                raise ValueError(f"Invalid lookup id '{raw_id}' in {csv_path}") from exc
+            rows.append((value_id, raw_value))
+    return rows
+
+
+def build_lookup_store(
+    output_dir: Path = OUTPUT_DIR,
+    store_path: Path = STORE_PATH,
+    show_progress: bool = True,
+) -> int:
+    """Load every */*_distinct.csv under output_dir into store_path and return the lookup count."""
+    csv_paths = sorted(output_dir.glob(f"*/*{DISTINCT_SUFFIX}"))
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_name(store_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(STORE_VERSION),))
+        for csv_path in csv_paths:
+            name = csv_path.relative_to(output_dir).as_posix()[: -len(DISTINCT_SUFFIX)]
+            stat = csv_path.stat()
+            rows = read_distinct_csv(csv_path, show_progress=show_progress)
+            connection.executemany(
+                "INSERT INTO lookup (name, position, id, value) VALUES (?, ?, ?, ?)",
+                ((name, position, value_id, value) for position, (value_id, value) in enumerate(rows)),
+            )
+            connection.execute(
+                "INSERT INTO source (name, size, mtime_ns) VALUES (?, ?, ?)",
+                (name, stat.st_size, stat.st_mtime_ns),
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, store_path)
+    return len(csv_paths)
+
+
+class LookupStore:
+    """Read lookups by name, from the SQLite store when it is fresh, else from the CSV.
+
+    Use through open_lookup_store(). Values handed out by lookup_map() are
+    interned, since the generators compare every dataset cell against them.
+    """
+
+    def __init__(
+        self,
+        store_path: Path = STORE_PATH,
+        output_dir: Path = OUTPUT_DIR,
+        show_progress: bool = True,
+    ) -> None:
+        self.store_path = store_path
+        self.output_dir = output_dir
+        self.show_progress = show_progress
+        self._connection: sqlite3.Connection | None = None
+        self._sources: dict[str, tuple[int, int]] = {}
+
+    def __enter__(self) -> LookupStore:
+        if not self.store_path.exists():
+            return self
+        try:
+            connection = sqlite3.connect(f"{self.store_path.resolve().as_uri()}?mode=ro", uri=True)
+            row = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.Error:
+            return self
+        if row is None or row[0] != str(STORE_VERSION):
+            connection.close()
+            return self
+        self._connection = connection
+        self._sources = {
+            name: (size, mtime_ns)
+            for name, size, mtime_ns in connection.execute("SELECT name, size, mtime_ns FROM source")
+        }
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def is_fresh(self, name: str) -> bool:
+        if self._connection is None or name not in self._sources:
+            return False
+        try:
+            stat = lookup_csv_path(name, self.output_dir).stat()
+        except FileNotFoundError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._sources[name]
+
+    def values(self, name: str) -> list[tuple[int, str]]:
+        """Return the (id, value) rows of a lookup in CSV order."""
+        if not self.is_fresh(name):
+            return read_distinct_csv(lookup_csv_path(name, self.output_dir), show_progress=self.show_progress)
+        return self._connection.execute(
+            "SELECT id, value FROM lookup WHERE name = ? ORDER BY position",
+            (name,),
+        ).fetchall()
+
+    def lookup_map(self, name: str) -> dict[str, int]:
+        """Return the value -> id map of a lookup; a repeated value keeps its last id."""
+        return {sys.intern(value): value_id for value_id, value in self.values(name)}
+
+
+def open_lookup_store(
+    store_path: Path = STORE_PATH,
+    output_dir: Path = OUTPUT_DIR,
+    show_progress: bool = True,
+) -> LookupStore:
+    """Open the lookup store; lookups it lacks or holds stale are read from their CSV."""
+    return LookupStore(store_path, output_dir, show_progress=show_progress)
@@ -0,0 +1,54 @@
+"""Progress bars for streaming reads that do not need a row count up front.
+
+The bar total is the file size from fstat and it advances with the position of
+the handle's underlying binary buffer, so large CSVs are read exactly once.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable, Iterator, TextIO, TypeVar
+
+from tqdm import tqdm
+
+
+T = TypeVar("T")
+
+# Reading the buffer position is cheap but not free; refresh every N rows.
+UPDATE_EVERY_ROWS = 4096
+
+
+def track_read_progress(
+    rows: Iterable[T],
+    handle: TextIO,
+    desc: str | None = None,
+    show_progress: bool = True,
+    position: int | None = None,
+) -> Iterator[T]:
+    """Yield rows while advancing a byte-based progress bar for handle.
+
+    position pins the bar to a terminal line when several read at once.
+    """
+    if not show_progress:
+        yield from rows
+        return
+
+    buffer = handle.buffer  # type: ignore[attr-defined]
+    total = os.fstat(handle.fileno()).st_size
+    with tqdm(
+        total=total,
+        desc=desc,
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        position=position,
+    ) as progress_bar:
+        offset = buffer.tell()
+        progress_bar.update(offset)
+        for index, row in enumerate(rows, start=1):
+            yield row
+            if index % UPDATE_EVERY_ROWS == 0:
+                current = buffer.tell()
+                progress_bar.update(current - offset)
+                offset = current
+        progress_bar.update(buffer.tell() - offset)
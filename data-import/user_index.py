@@ -0,0 +1,231 @@
+"""Per-username index of the user-keyed dataset CSVs (ratings, favs, profiles).
+
+generate_user_index.py copies each CSV once into data-import/cache/
+user_index.sqlite, one table per file named after its stem. Rows are stored
+clustered by (username, position), position being the row number in the CSV,
+so all rows of one user are contiguous on disk and a lookup is a primary-key
+seek rather than a scan of the whole file. Cells are stored as the strings
+open_dataset() yields, so callers keep their own parsing rules.
+
+Readers go through open_user_rows(), which serves the rows of the requested
+usernames from the index while it matches the source CSV (size and mtime)
+and otherwise falls back to scanning the CSV with open_dataset(). Rows of a
+user come back in CSV order either way.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from dataset_cache import CACHE_DIR, open_dataset
+
+
+INDEX_PATH = CACHE_DIR / "user_index.sqlite"
+INDEX_VERSION = 1
+KEY_COLUMN = "username"
+INSERT_BATCH_ROWS = 65536
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect_index(index_path: Path = INDEX_PATH) -> sqlite3.Connection:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(index_path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS source ("
+        "name TEXT PRIMARY KEY, version INTEGER NOT NULL, size INTEGER NOT NULL, "
+        "mtime_ns INTEGER NOT NULL, rows INTEGER NOT NULL, columns TEXT NOT NULL)"
+    )
+    return connection
+
+
+def source_columns(connection: sqlite3.Connection, csv_path: Path) -> list[str] | None:
+    """Return the columns of the index table of csv_path if it is up to date, else None."""
+    row = connection.execute(
+        "SELECT version, size, mtime_ns, columns FROM source WHERE name = ?",
+        (csv_path.stem,),
+    ).fetchone()
+    if row is None or row[0] != INDEX_VERSION:
+        return None
+    stat = csv_path.stat()
+    if (stat.st_size, stat.st_mtime_ns) != (row[1], row[2]):
+        return None
+    return row[3].split(",")
+
+
+def build_user_index(
+    csv_path: Path,
+    index_path: Path = INDEX_PATH,
+    encoding: str = "utf-8",
+    show_progress: bool = True,
+) -> int:
+    """(Re)build the index table of csv_path and return its row count."""
+    stat = csv_path.stat()
+    table = quote_identifier(csv_path.stem)
+    connection = connect_index(index_path)
+    try:
+        with open_dataset(
+            csv_path,
+            desc=f"Indexing {csv_path.name}",
+            show_progress=show_progress,
+            encoding=encoding,
+        ) as reader:
+            columns = list(reader.fieldnames)
+            if KEY_COLUMN not in columns:
+                raise ValueError(f"Missing column '{KEY_COLUMN}' in {csv_path}")
+            if len(set(columns)) != len(columns) or "position" in columns:
+                raise ValueError(f"Unsupported column names in {csv_path}: {columns}")
+            value_columns = [column for column in columns if column != KEY_COLUMN]
+
+            # Forget the entry first so the table is never marked fresh while half rebuilt.
+            connection.execute("DELETE FROM source WHERE name = ?", (csv_path.stem,))
+            connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.execute(
+                f"CREATE TABLE {table} ({KEY_COLUMN} TEXT NOT NULL, position INTEGER NOT NULL, "
+                + "".join(f"{quote_identifier(column)} TEXT, " for column in value_columns)
+                + f"PRIMARY KEY ({KEY_COLUMN}, position)) WITHOUT ROWID"
+            )
+            insert = (
+                f"INSERT INTO {table} VALUES ({', '.join('?' for _ in range(len(value_columns) + 2))})"
+            )
+
+            row_count = 0
+            batch: list[tuple[Any, ...]] = []
+            for row in reader:
+                batch.append(
+                    (row.get(KEY_COLUMN) or "", row_count, *(row.get(column) for column in value_columns))
+                )
+                row_count += 1
+                if len(batch) >= INSERT_BATCH_ROWS:
+                    connection.executemany(insert, batch)
+                    batch.clear()
+            if batch:
+                connection.executemany(insert, batch)
+
+        connection.execute(
+            "INSERT INTO source (name, version, size, mtime_ns, rows, columns) VALUES (?, ?, ?, ?, ?, ?)",
+            (csv_path.stem, INDEX_VERSION, stat.st_size, stat.st_mtime_ns, row_count, ",".join(columns)),
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    return row_count
+
+
+def index_is_fresh(csv_path: Path, index_path: Path = INDEX_PATH) -> bool:
+    if not index_path.exists():
+        return False
+    connection = sqlite3.connect(f"{index_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return source_columns(connection, csv_path) is not None
+    except sqlite3.Error:
+        return False
+    finally:
+        connection.close()
+
+
+class UserRowsReader:
+    """Iterate the rows of csv_path that belong to usernames, as dicts.
+
+    Use through open_user_rows(). indexed tells whether rows come from the
+    index; otherwise every row of the CSV is yielded and the caller filters.
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        usernames: Iterable[str],
+        columns: Iterable[str] | None = None,
+        desc: str | None = None,
+        show_progress: bool = True,
+        index_path: Path = INDEX_PATH,
+        position: int | None = None,
+    ) -> None:
+        self.csv_path = csv_path
+        self.usernames = usernames
+        self.columns = None if columns is None else list(columns)
+        self.desc = desc
+        self.show_progress = show_progress
+        self.index_path = index_path
+        self.position = position
+        self.fieldnames: list[str] = []
+        self.indexed = False
+        self._connection: sqlite3.Connection | None = None
+        self._dataset: Any = None
+
+    def __enter__(self) -> UserRowsReader:
+        if self.index_path.exists():
+            connection = sqlite3.connect(f"{self.index_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                columns = source_columns(connection, self.csv_path)
+            except sqlite3.Error:
+                columns = None
+            if columns is not None:
+                self._connection = connection
+                self.indexed = True
+                self.fieldnames = columns
+                return self
+            connection.close()
+
+        self._dataset = open_dataset(
+            self.csv_path,
+            self.columns,
+            desc=self.desc,
+            show_progress=self.show_progress,
+            position=self.position,
+        )
+        self._dataset.__enter__()
+        self.fieldnames = self._dataset.fieldnames
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._dataset is not None:
+            self._dataset.__exit__(*exc_info)
+            self._dataset = None
+
+    def __iter__(self) -> Iterator[dict[str, str | None]]:
+        if self._dataset is not None:
+            yield from self._dataset
+            return
+        if self._connection is None:
+            raise RuntimeError("UserRowsReader must be used as a context manager")
+
+        wanted = [
+            column for column in self.fieldnames if self.columns is None or column in self.columns
+        ]
+        table = quote_identifier(self.csv_path.stem)
+        select = ", ".join(f"t.{quote_identifier(column)}" for column in wanted)
+        cursor = self._connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_user (username TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM wanted_user")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO wanted_user (username) VALUES (?)",
+            ((username,) for username in self.usernames),
+        )
+        # CROSS JOIN keeps wanted_user as the outer loop, so each user is one
+        # primary-key seek instead of a scan of the whole table.
+        cursor.execute(
+            f"SELECT {select} FROM wanted_user AS w CROSS JOIN {table} AS t ON t.{KEY_COLUMN} = w.username "
+            f"ORDER BY t.{KEY_COLUMN}, t.position"
+        )
+        for values in cursor:
+            yield dict(zip(wanted, values))
+
+
+def open_user_rows(
+    csv_path: Path,
+    usernames: Iterable[str],
+    columns: Iterable[str] | None = None,
+    desc: str | None = None,
+    show_progress: bool = True,
+    position: int | None = None,
+) -> UserRowsReader:
+    """Open the rows of usernames in a user-keyed dataset, from the index when it is fresh."""
+    return UserRowsReader(csv_path, usernames, columns, desc=desc, show_progress=show_progress, position=position)
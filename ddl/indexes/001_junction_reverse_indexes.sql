@@ -0,0 +1,13 @@
+CREATE INDEX IF NOT EXISTS idx_anime_genre_genre_id ON anime_genre (genre_id);
+CREATE INDEX IF NOT EXISTS idx_anime_explicit_genre_explicit_genre_id ON anime_explicit_genre (explicit_genre_id);
+CREATE INDEX IF NOT EXISTS idx_anime_licensor_licensor_id ON anime_licensor (licensor_id);
+CREATE INDEX IF NOT EXISTS idx_anime_demographic_demographic_id ON anime_demographic (demographic_id);
+CREATE INDEX IF NOT EXISTS idx_anime_producer_producer_id ON anime_producer (producer_id);
+CREATE INDEX IF NOT EXISTS idx_anime_streaming_service_streaming_service_id ON anime_streaming_service (streaming_service_id);
+CREATE INDEX IF NOT EXISTS idx_anime_studio_studio_id ON anime_studio (studio_id);
+CREATE INDEX IF NOT EXISTS idx_anime_theme_theme_id ON anime_theme (theme_id);
+CREATE INDEX IF NOT EXISTS idx_character_anime_work_character_id ON character_anime_work (character_id);
+CREATE INDEX IF NOT EXISTS idx_person_anime_work_person_id ON person_anime_work (person_id);
+CREATE INDEX IF NOT EXISTS idx_person_voice_work_anime_id ON person_voice_work (anime_id);
+CREATE INDEX IF NOT EXISTS idx_person_voice_work_character_id ON person_voice_work (character_id);
+CREATE INDEX IF NOT EXISTS idx_anime_recommendation_recommended_anime_id ON anime_recommendation (recommended_anime_id);
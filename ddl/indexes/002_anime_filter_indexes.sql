@@ -0,0 +1,3 @@
+CREATE INDEX IF NOT EXISTS idx_anime_season_id ON anime (season_id);
+CREATE INDEX IF NOT EXISTS idx_anime_year ON anime (year);
+CREATE INDEX IF NOT EXISTS idx_anime_score ON anime (score);
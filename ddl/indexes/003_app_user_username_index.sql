@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS idx_app_user_username ON app_user (username);
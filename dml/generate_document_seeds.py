@@ -3,19 +3,22 @@
 Generate NoSQL JSON seed documents from CSV datasets.
 
 Step 1 only: create JSON files on disk.
-Use run-nosql.py as Step 2 to load generated JSON into MongoDB.
+Use run-nosql.py as Step 2 to load generated JSON into MongoDB, or pass
+--output-format mongo to insert the documents directly as they are built.
 """
 
 from __future__ import annotations
 
 import argparse
-import csv
+import gzip
 import json
 import os
+import sqlite3
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, TextIO
 
 import psycopg
 from tqdm import tqdm
@@ -26,11 +29,17 @@ OUTPUT_DIR = Path(__file__).resolve().parent / "document-seeds"
 PROFILES_CSV = DATASETS_DIR / "profiles.csv"
 RATINGS_CSV = DATASETS_DIR / "ratings.csv"
 FAVS_CSV = DATASETS_DIR / "favs.csv"
+# Ratings per user that fit in one per-user id range; MAL lists stay far below it.
+RATING_ID_STRIDE = 1_000_000
+# Ratings embedded in a user document with --user-layout embedded; the rest go
+# to the overflow bucket as rating ids.
+DEFAULT_EMBED_CAP = 200
+RATING_STATUSES = ("watching", "completed", "on_hold", "dropped", "plan_to_watch")
+# zlib's default level; 9 is several times slower for a few percent smaller files.
+GZIP_LEVEL = 6
 
-
-def count_data_rows(file_path: Path) -> int:
-    with file_path.open("r", encoding="utf-8") as file:
-        return max(sum(1 for _ in file) - 1, 0)
+sys.path.insert(0, str(DATASETS_DIR.parent))
+from user_index import build_user_index, index_is_fresh, open_user_rows  # noqa: E402
 
 
 def load_env_variables() -> None:
@@ -58,6 +67,27 @@ def resolve_sql_connection_string(connection_string: str | None) -> str:
     )
 
 
+def resolve_nosql_connection_string(connection_string: str | None) -> str:
+    if connection_string:
+        return connection_string
+    database_url = os.getenv("NOSQL_DATABASE_URL")
+    if database_url:
+        return database_url
+    raise ValueError(
+        "Missing MongoDB connection string. Pass it with --nosql-connection-string "
+        "or set NOSQL_DATABASE_URL environment variable."
+    )
+
+
+def resolve_database_name(database_name: str | None) -> str:
+    if database_name:
+        return database_name
+    database_name = os.getenv("MONGO_DB")
+    if database_name:
+        return database_name
+    raise ValueError("Missing MongoDB database name. Pass it with --database or set MONGO_DB.")
+
+
 def fetch_usernames_from_db(sql_connection_string: str, user_ids: list[int]) -> dict[int, str]:
     try:
         with psycopg.connect(sql_connection_string) as conn:
@@ -98,18 +128,17 @@ def should_enable_tqdm(mode: str) -> bool:
     return True
 
 
-def load_profiles(usernames: set[str], show_progress: bool) -> dict[str, dict[str, Any]]:
+def load_profiles(usernames: set[str], show_progress: bool, position: int | None = None) -> dict[str, dict[str, Any]]:
     profiles: dict[str, dict[str, Any]] = {}
-    total_rows = count_data_rows(PROFILES_CSV)
-    with PROFILES_CSV.open("r", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in tqdm(
-            reader,
-            total=total_rows,
-            desc="Loading profiles",
-            unit="row",
-            disable=not show_progress,
-        ):
+    with open_user_rows(
+        PROFILES_CSV,
+        usernames,
+        ("username", "watching", "completed", "on_hold", "dropped", "plan_to_watch"),
+        desc="Loading profiles",
+        show_progress=show_progress,
+        position=position,
+    ) as reader:
+        for row in reader:
             username = row.get("username", "")
             if username in usernames:
                 profiles[username] = {
@@ -124,18 +153,17 @@ def load_profiles(usernames: set[str], show_progress: bool) -> dict[str, dict[st
     return profiles
 
 
-def load_ratings(usernames: set[str], show_progress: bool) -> dict[str, list[dict[str, int | str]]]:
+def load_ratings(usernames: set[str], show_progress: bool, position: int | None = None) -> dict[str, list[dict[str, int | str]]]:
     ratings: dict[str, list[dict[str, int | str]]] = defaultdict(list)
-    total_rows = count_data_rows(RATINGS_CSV)
-    with RATINGS_CSV.open("r", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in tqdm(
-            reader,
-            total=total_rows,
-            desc="Loading ratings",
-            unit="row",
-            disable=not show_progress,
-        ):
+    with open_user_rows(
+        RATINGS_CSV,
+        usernames,
+        ("username", "anime_id", "status", "score", "num_watched_episodes"),
+        desc="Loading ratings",
+        show_progress=show_progress,
+        position=position,
+    ) as reader:
+        for row in reader:
             username = row.get("username", "")
             if username in usernames:
                 ratings[username].append(
@@ -149,20 +177,19 @@ def load_ratings(usernames: set[str], show_progress: bool) -> dict[str, list[dic
     return dict(ratings)
 
 
-def load_favorites(usernames: set[str], show_progress: bool) -> dict[str, dict[str, list[int]]]:
+def load_favorites(usernames: set[str], show_progress: bool, position: int | None = None) -> dict[str, dict[str, list[int]]]:
     favorites: dict[str, dict[str, list[int]]] = defaultdict(
         lambda: {"anime": [], "characters": [], "people": []}
     )
-    total_rows = count_data_rows(FAVS_CSV)
-    with FAVS_CSV.open("r", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in tqdm(
-            reader,
-            total=total_rows,
-            desc="Loading favorites",
-            unit="row",
-            disable=not show_progress,
-        ):
+    with open_user_rows(
+        FAVS_CSV,
+        usernames,
+        ("username", "fav_type", "id"),
+        desc="Loading favorites",
+        show_progress=show_progress,
+        position=position,
+    ) as reader:
+        for row in reader:
             username = row.get("username", "")
             if username in usernames:
                 fav_type = str(row.get("fav_type", "")).strip()
@@ -178,13 +205,51 @@ def load_favorites(usernames: set[str], show_progress: bool) -> dict[str, dict[s
     return dict(favorites)
 
 
-def build_rating_documents(
+def load_sources(
+    usernames: set[str],
+    read_strategy: str,
+    show_progress: bool,
+) -> tuple[dict[str, dict[str, Any]], dict[str, list[dict[str, int | str]]], dict[str, dict[str, list[int]]]]:
+    """Load profiles, ratings and favorites of usernames, one file after another or concurrently."""
+    if read_strategy == "sequential":
+        return (
+            load_profiles(usernames, show_progress=show_progress),
+            load_ratings(usernames, show_progress=show_progress),
+            load_favorites(usernames, show_progress=show_progress),
+        )
+
+    # One reader thread per file over the same read-only username set, each
+    # bar on its own line. Threads only overlap waiting on the disk: csv
+    # parsing and building the dicts hold the GIL, so on a warm page cache
+    # this is no faster than sequential.
+    lookup = frozenset(usernames)
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="reader") as executor:
+        profiles = executor.submit(load_profiles, lookup, show_progress, 0)
+        ratings = executor.submit(load_ratings, lookup, show_progress, 1)
+        favorites = executor.submit(load_favorites, lookup, show_progress, 2)
+        return profiles.result(), ratings.result(), favorites.result()
+
+
+def per_user_rating_id(user_id: int, position: int) -> int:
+    """Rating id from a fixed range per user: user_id * RATING_ID_STRIDE + position (1-based)."""
+    if position >= RATING_ID_STRIDE:
+        raise ValueError(f"User {user_id} has more than {RATING_ID_STRIDE - 1} ratings")
+    return user_id * RATING_ID_STRIDE + position
+
+
+def iter_rating_documents(
     ratings_data: dict[str, list[dict[str, int | str]]],
     user_id_to_username: dict[int, str],
+    user_rating_ids: dict[int, list[int]],
     show_progress: bool,
-) -> tuple[dict[int, list[int]], list[dict[str, int | str]]]:
-    rating_documents: list[dict[str, int | str]] = []
-    user_rating_ids: dict[int, list[int]] = defaultdict(list)
+    rating_ids: str = "sequential",
+) -> Iterator[dict[str, int | str]]:
+    """Yield rating documents user by user, recording each user's rating ids in user_rating_ids.
+
+    rating_ids "sequential" numbers ratings 1, 2, 3... across all users in
+    user id order; "per-user" derives them from per_user_rating_id(), so they
+    do not depend on which other users are generated.
+    """
     current_rating_id = 1
 
     for user_id in tqdm(
@@ -194,31 +259,86 @@ def build_rating_documents(
         disable=not show_progress,
     ):
         username = user_id_to_username[user_id]
-        for rating_data in ratings_data.get(username, []):
+        for position, rating_data in enumerate(ratings_data.get(username, []), start=1):
+            if rating_ids == "per-user":
+                rating_id = per_user_rating_id(user_id, position)
+            else:
+                rating_id = current_rating_id
+                current_rating_id += 1
             rating_doc: dict[str, int | str] = {
-                "id": current_rating_id,
+                "id": rating_id,
                 "user_id": user_id,
                 "anime_id": int(rating_data["anime_id"]),
                 "status": str(rating_data["status"]),
                 "score": int(rating_data["score"]),
                 "num_watched_episodes": int(rating_data["num_watched_episodes"]),
             }
-            rating_documents.append(rating_doc)
-            user_rating_ids[user_id].append(current_rating_id)
-            current_rating_id += 1
+            user_rating_ids.setdefault(user_id, []).append(rating_id)
+            yield rating_doc
+
 
-    return dict(user_rating_ids), rating_documents
+def build_rating_documents(
+    ratings_data: dict[str, list[dict[str, int | str]]],
+    user_id_to_username: dict[int, str],
+    show_progress: bool,
+    rating_ids: str = "sequential",
+) -> tuple[dict[int, list[int]], list[dict[str, int | str]]]:
+    user_rating_ids: dict[int, list[int]] = {}
+    rating_documents = list(
+        iter_rating_documents(ratings_data, user_id_to_username, user_rating_ids, show_progress, rating_ids)
+    )
+    return user_rating_ids, rating_documents
+
+
+def build_rating_summary(
+    ratings: list[dict[str, int | str]],
+    rating_ids: list[int],
+    embed_cap: int,
+) -> dict[str, Any]:
+    """Summarize a user's ratings for the embedded layout.
+
+    The first embed_cap ratings (in dataset order) are embedded; the ids of the
+    others are kept in the overflow bucket, to be fetched from ratings.
+    status_counts covers every rating, not only the embedded ones.
+    """
+    status_counts = dict.fromkeys(RATING_STATUSES, 0)
+    for rating in ratings:
+        status = str(rating["status"])
+        if status:
+            status_counts[status] = status_counts.get(status, 0) + 1
+    overflow_ids = rating_ids[embed_cap:]
+    return {
+        "count": len(ratings),
+        "status_counts": status_counts,
+        "items": [
+            {
+                "anime_id": int(rating["anime_id"]),
+                "score": int(rating["score"]),
+                "status": str(rating["status"]),
+                "episodes": int(rating["num_watched_episodes"]),
+            }
+            for rating in ratings[:embed_cap]
+        ],
+        "overflow": {"count": len(overflow_ids), "rating_ids": overflow_ids},
+    }
 
 
-def build_user_documents(
+def iter_user_documents(
     user_id_to_username: dict[int, str],
     profiles_data: dict[str, dict[str, Any]],
     user_rating_ids: dict[int, list[int]],
     favorites_data: dict[str, dict[str, list[int]]],
     show_progress: bool,
-) -> list[dict[str, Any]]:
-    user_documents: list[dict[str, Any]] = []
-
+    user_layout: str = "reference",
+    ratings_data: dict[str, list[dict[str, int | str]]] | None = None,
+    embed_cap: int = DEFAULT_EMBED_CAP,
+) -> Iterator[dict[str, Any]]:
+    """Yield user documents in user id order.
+
+    user_layout "reference" stores the user's rating ids in "ratings";
+    "embedded" replaces them with a rating_summary built from ratings_data
+    (see build_rating_summary()), so a profile read needs a single document.
+    """
     for user_id in tqdm(
         sorted(user_id_to_username.keys()),
         desc="Building user documents",
@@ -242,24 +362,270 @@ def build_user_documents(
             username,
             {"anime": [], "characters": [], "people": []},
         )
-        user_documents.append(
-            {
+        if user_layout == "embedded":
+            yield {
                 "id": user_id,
                 "stats": profile["stats"],
-                "ratings": user_rating_ids.get(user_id, []),
+                "rating_summary": build_rating_summary(
+                    (ratings_data or {}).get(username, []),
+                    user_rating_ids.get(user_id, []),
+                    embed_cap,
+                ),
                 "favorites": favorites,
             }
+            continue
+        yield {
+            "id": user_id,
+            "stats": profile["stats"],
+            "ratings": user_rating_ids.get(user_id, []),
+            "favorites": favorites,
+        }
+
+
+def build_user_documents(
+    user_id_to_username: dict[int, str],
+    profiles_data: dict[str, dict[str, Any]],
+    user_rating_ids: dict[int, list[int]],
+    favorites_data: dict[str, dict[str, list[int]]],
+    show_progress: bool,
+    user_layout: str = "reference",
+    ratings_data: dict[str, list[dict[str, int | str]]] | None = None,
+    embed_cap: int = DEFAULT_EMBED_CAP,
+) -> list[dict[str, Any]]:
+    return list(
+        iter_user_documents(
+            user_id_to_username,
+            profiles_data,
+            user_rating_ids,
+            favorites_data,
+            show_progress,
+            user_layout,
+            ratings_data,
+            embed_cap,
         )
+    )
 
-    return user_documents
+
+def open_output(path: Path) -> TextIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL)
+    return path.open("w", encoding="utf-8")
 
 
 def write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as file:
+    with open_output(path) as file:
         json.dump(payload, file, ensure_ascii=False, indent=2)
 
 
+def write_ndjson(path: Path, documents: Iterable[dict[str, Any]]) -> int:
+    """Write one JSON document per line as they are produced and return the count."""
+    count = 0
+    with open_output(path) as file:
+        for document in documents:
+            file.write(json.dumps(document, ensure_ascii=False))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def write_documents(
+    users_path: Path,
+    ratings_path: Path,
+    output_format: str,
+    user_id_to_username: dict[int, str],
+    profiles_data: dict[str, dict[str, Any]],
+    ratings_data: dict[str, list[dict[str, int | str]]],
+    favorites_data: dict[str, dict[str, list[int]]],
+    rating_ids: str,
+    show_progress: bool,
+    user_layout: str = "reference",
+    embed_cap: int = DEFAULT_EMBED_CAP,
+) -> tuple[int, int]:
+    """Write the users and ratings files as json or ndjson and return (users, ratings) written."""
+    if output_format == "ndjson":
+        user_rating_ids: dict[int, list[int]] = {}
+        ratings_count = write_ndjson(
+            ratings_path,
+            iter_rating_documents(ratings_data, user_id_to_username, user_rating_ids, show_progress, rating_ids),
+        )
+        users_count = write_ndjson(
+            users_path,
+            iter_user_documents(
+                user_id_to_username,
+                profiles_data,
+                user_rating_ids,
+                favorites_data,
+                show_progress=show_progress,
+                user_layout=user_layout,
+                ratings_data=ratings_data,
+                embed_cap=embed_cap,
+            ),
+        )
+        return users_count, ratings_count
+
+    user_rating_ids, rating_documents = build_rating_documents(
+        ratings_data,
+        user_id_to_username,
+        show_progress=show_progress,
+        rating_ids=rating_ids,
+    )
+    user_documents = build_user_documents(
+        user_id_to_username,
+        profiles_data,
+        user_rating_ids,
+        favorites_data,
+        show_progress=show_progress,
+        user_layout=user_layout,
+        ratings_data=ratings_data,
+        embed_cap=embed_cap,
+    )
+    write_json(users_path, user_documents)
+    write_json(ratings_path, rating_documents)
+    return len(user_documents), len(rating_documents)
+
+
+def shard_user_ids(user_ids: Iterable[int], shards: int) -> list[list[int]]:
+    """Deal the sorted user ids round-robin into at most shards non-empty shards."""
+    ordered = sorted(user_ids)
+    return [ordered[shard::shards] for shard in range(min(shards, len(ordered)))]
+
+
+def generate_shard(
+    shard: int,
+    user_id_to_username: dict[int, str],
+    output_dir: Path,
+    output_format: str,
+    compression: str,
+    read_strategy: str,
+    user_layout: str,
+    embed_cap: int,
+) -> dict[str, Any]:
+    """Read and write the documents of one shard in a worker process; return its manifest entry.
+
+    Ratings get per-user ids, the only numbering that needs no counter shared
+    between shards.
+    """
+    profiles_data, ratings_data, favorites_data = load_sources(
+        set(user_id_to_username.values()),
+        read_strategy,
+        show_progress=False,
+    )
+    users_path = output_dir / f"users-{shard:03d}.{output_format}{compression}"
+    ratings_path = output_dir / f"ratings-{shard:03d}.{output_format}{compression}"
+    users_count, ratings_count = write_documents(
+        users_path,
+        ratings_path,
+        output_format,
+        user_id_to_username,
+        profiles_data,
+        ratings_data,
+        favorites_data,
+        rating_ids="per-user",
+        show_progress=False,
+        user_layout=user_layout,
+        embed_cap=embed_cap,
+    )
+    return {
+        "users_file": str(users_path),
+        "ratings_file": str(ratings_path),
+        "users_count": users_count,
+        "ratings_count": ratings_count,
+        "user_ids": sorted(user_id_to_username.keys()),
+    }
+
+
+def generate_shards(
+    user_id_to_username: dict[int, str],
+    shards: int,
+    output_dir: Path,
+    output_format: str,
+    compression: str,
+    read_strategy: str,
+    user_layout: str,
+    embed_cap: int,
+    show_progress: bool,
+) -> list[dict[str, Any]]:
+    """Generate the shards in worker processes, at most one per CPU, and return their manifest entries.
+
+    Each process reads only the rows of its own users, so with the username
+    index the work splits evenly and runs without any shared state.
+    """
+    partitions = shard_user_ids(user_id_to_username.keys(), shards)
+    entries: list[dict[str, Any]] = [{} for _ in partitions]
+    with ProcessPoolExecutor(max_workers=min(len(partitions), os.cpu_count() or 1)) as executor:
+        futures = {
+            executor.submit(
+                generate_shard,
+                shard,
+                {user_id: user_id_to_username[user_id] for user_id in user_ids},
+                output_dir,
+                output_format,
+                compression,
+                read_strategy,
+                user_layout,
+                embed_cap,
+            ): shard
+            for shard, user_ids in enumerate(partitions)
+        }
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            desc="Generating shards",
+            unit="shard",
+            disable=not show_progress,
+        ):
+            entries[futures[future]] = future.result()
+    return entries
+
+
+def load_documents_into_mongo(
+    connection_string: str,
+    database_name: str,
+    ratings_documents: Iterable[dict[str, Any]],
+    user_documents: Iterable[dict[str, Any]],
+    clear_collections: bool,
+    batch_size: int,
+) -> tuple[int, int]:
+    """Insert the documents while they are built and return (users, ratings) inserted.
+
+    Ratings are consumed first because building them fills the rating ids the
+    user documents reference.
+    """
+    from pymongo import MongoClient
+
+    from mongo_load import MongoBatchWriter, create_indexes
+
+    try:
+        client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
+        client.admin.command("ping")
+        db = client[database_name]
+        users_collection = db["users"]
+        ratings_collection = db["ratings"]
+
+        if clear_collections:
+            users_collection.delete_many({})
+            ratings_collection.delete_many({})
+            print("Cleared existing documents from users and ratings collections.")
+
+        with MongoBatchWriter(ratings_collection, batch_size) as writer:
+            writer.write_many(ratings_documents)
+        with MongoBatchWriter(users_collection, batch_size) as users_writer:
+            users_writer.write_many(user_documents)
+        print(f"Inserted {users_writer.inserted} user documents into {database_name}.users")
+        print(f"Inserted {writer.inserted} rating documents into {database_name}.ratings")
+
+        if users_writer.inserted:
+            create_indexes(users_collection)
+        if writer.inserted:
+            create_indexes(ratings_collection)
+        client.close()
+    except Exception as exc:
+        print(f"Error: Failed to load documents into MongoDB: {exc}", file=sys.stderr)
+        sys.exit(1)
+    return users_writer.inserted, writer.inserted
+
+
 def parse_user_ids(raw_ids: str) -> list[int]:
     try:
         ids = [int(item.strip()) for item in raw_ids.split(",") if item.strip()]
@@ -303,6 +669,85 @@ def main() -> None:
         default=str(OUTPUT_DIR),
         help="Output directory for generated JSON files (default: dml/document-seeds)",
     )
+    parser.add_argument(
+        "--output-format",
+        choices=("json", "ndjson", "mongo"),
+        default="json",
+        help=(
+            "json writes users.json/ratings.json as indented arrays; ndjson writes one document "
+            "per line as documents are built, without holding them in memory; mongo inserts the "
+            "documents straight into MongoDB as they are built, writing no files (default: json)."
+        ),
+    )
+    parser.add_argument(
+        "--nosql-connection-string",
+        help="MongoDB connection string for --output-format mongo. Falls back to NOSQL_DATABASE_URL.",
+    )
+    parser.add_argument(
+        "--database",
+        help="MongoDB database name for --output-format mongo. Falls back to MONGO_DB.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Documents per insert_many batch for --output-format mongo (default: 1000).",
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="With --output-format mongo, delete existing users and ratings documents first.",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Gzip-compress the users and ratings files (adds a .gz suffix).",
+    )
+    parser.add_argument(
+        "--rating-ids",
+        choices=("sequential", "per-user"),
+        help=(
+            "sequential numbers ratings 1, 2, 3... across all users; per-user gives each user the "
+            f"range user_id * {RATING_ID_STRIDE:_} + 1, 2, 3..., so ids do not change when other "
+            "users are added and can be computed in parallel (default: sequential, per-user with --shards)."
+        ),
+    )
+    parser.add_argument(
+        "--user-layout",
+        choices=("reference", "embedded"),
+        default="reference",
+        help=(
+            "reference stores each user's rating ids (schema/user_document.json); embedded stores a "
+            "rating_summary with up to --embed-cap ratings, the ids of the others and per-status "
+            "counts (schema/user_document_embedded.json) (default: reference)."
+        ),
+    )
+    parser.add_argument(
+        "--embed-cap",
+        type=int,
+        default=DEFAULT_EMBED_CAP,
+        help=f"Ratings embedded per user with --user-layout embedded (default: {DEFAULT_EMBED_CAP}).",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help=(
+            "Split the users into this many shards generated by parallel worker processes (at most "
+            "one per CPU), each writing its own users-NNN/ratings-NNN files listed in manifest.json. "
+            "Needs json or ndjson output and per-user rating ids (default: 1)."
+        ),
+    )
+    parser.add_argument(
+        "--read-strategy",
+        choices=("sequential", "concurrent"),
+        default="sequential",
+        help=(
+            "Read profiles.csv, ratings.csv and favs.csv one after another, or all three at "
+            "the same time with one reader thread each, which only helps when the reads wait "
+            "on the disk (default: sequential)."
+        ),
+    )
     parser.add_argument(
         "--progress",
         choices=("linear", "detailed", "off"),
@@ -319,6 +764,21 @@ def main() -> None:
             user_ids = parse_user_ids_file(args.user_ids_file)
         else:
             user_ids = parse_user_ids(args.user_ids)
+        if args.shards < 1:
+            raise ValueError("--shards must be at least 1.")
+        if args.embed_cap < 0:
+            raise ValueError("--embed-cap must not be negative.")
+        if args.shards > 1:
+            if args.output_format == "mongo":
+                raise ValueError("--shards writes files; load them with run-nosql.py instead of --output-format mongo.")
+            if args.rating_ids == "sequential":
+                raise ValueError("--shards needs --rating-ids per-user: sequential ids would overlap between shards.")
+        rating_ids = args.rating_ids or ("per-user" if args.shards > 1 else "sequential")
+        if args.output_format == "mongo":
+            if args.gzip:
+                raise ValueError("--gzip only applies to file output, not --output-format mongo.")
+            nosql_connection_string = resolve_nosql_connection_string(args.nosql_connection_string)
+            database_name = resolve_database_name(args.database)
     except ValueError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         sys.exit(1)
@@ -334,46 +794,115 @@ def main() -> None:
         print("Error: No valid users found in app_user for provided IDs.", file=sys.stderr)
         sys.exit(1)
 
-    usernames = set(user_id_to_username.values())
-    profiles_data = load_profiles(usernames, show_progress=show_progress)
-    ratings_data = load_ratings(usernames, show_progress=show_progress)
-    favorites_data = load_favorites(usernames, show_progress=show_progress)
+    output_dir = Path(args.output_dir)
+    compression = ".gz" if args.gzip else ""
+    manifest_path = output_dir / "manifest.json"
 
-    user_rating_ids, rating_documents = build_rating_documents(
-        ratings_data,
-        user_id_to_username,
+    if args.shards > 1:
+        # Without the username index every shard would scan the whole CSVs, so
+        # build or refresh it once here, before the workers start.
+        for csv_path in (PROFILES_CSV, RATINGS_CSV, FAVS_CSV):
+            if index_is_fresh(csv_path):
+                continue
+            try:
+                row_count = build_user_index(csv_path, show_progress=show_progress)
+            except (OSError, ValueError, sqlite3.Error) as exc:
+                print(f"Error: Failed to index {csv_path.name} by username: {exc}", file=sys.stderr)
+                sys.exit(1)
+            print(f"Indexed {csv_path.name} by username ({row_count} rows)")
+        shard_entries = generate_shards(
+            user_id_to_username,
+            args.shards,
+            output_dir,
+            args.output_format,
+            compression,
+            args.read_strategy,
+            args.user_layout,
+            args.embed_cap,
+            show_progress=show_progress,
+        )
+        users_count = sum(entry["users_count"] for entry in shard_entries)
+        ratings_count = sum(entry["ratings_count"] for entry in shard_entries)
+        write_json(
+            manifest_path,
+            {
+                "shards": shard_entries,
+                "users_count": users_count,
+                "ratings_count": ratings_count,
+                "user_ids": sorted(user_id_to_username.keys()),
+                "user_layout": args.user_layout,
+                "rating_ids": "per-user",
+            },
+        )
+        print(f"Generated {len(shard_entries)} {args.output_format.upper()} shards in {output_dir}")
+        print(f"Generated manifest JSON: {manifest_path}")
+        print(f"Total: {users_count} user documents, {ratings_count} rating documents")
+        return
+
+    usernames = set(user_id_to_username.values())
+    profiles_data, ratings_data, favorites_data = load_sources(
+        usernames,
+        args.read_strategy,
         show_progress=show_progress,
     )
-    user_documents = build_user_documents(
+
+    if args.output_format == "mongo":
+        user_rating_ids: dict[int, list[int]] = {}
+        users_count, ratings_count = load_documents_into_mongo(
+            nosql_connection_string,
+            database_name,
+            iter_rating_documents(
+                ratings_data, user_id_to_username, user_rating_ids, show_progress, rating_ids
+            ),
+            iter_user_documents(
+                user_id_to_username,
+                profiles_data,
+                user_rating_ids,
+                favorites_data,
+                show_progress=show_progress,
+                user_layout=args.user_layout,
+                ratings_data=ratings_data,
+                embed_cap=args.embed_cap,
+            ),
+            clear_collections=args.clear,
+            batch_size=max(1, args.batch_size),
+        )
+        print(f"Total: {users_count} user documents, {ratings_count} rating documents")
+        return
+
+    users_path = output_dir / f"users.{args.output_format}{compression}"
+    ratings_path = output_dir / f"ratings.{args.output_format}{compression}"
+    users_count, ratings_count = write_documents(
+        users_path,
+        ratings_path,
+        args.output_format,
         user_id_to_username,
         profiles_data,
-        user_rating_ids,
+        ratings_data,
         favorites_data,
+        rating_ids,
         show_progress=show_progress,
+        user_layout=args.user_layout,
+        embed_cap=args.embed_cap,
     )
 
-    output_dir = Path(args.output_dir)
-    users_path = output_dir / "users.json"
-    ratings_path = output_dir / "ratings.json"
-    manifest_path = output_dir / "manifest.json"
-
-    write_json(users_path, user_documents)
-    write_json(ratings_path, rating_documents)
     write_json(
         manifest_path,
         {
             "users_file": str(users_path),
             "ratings_file": str(ratings_path),
-            "users_count": len(user_documents),
-            "ratings_count": len(rating_documents),
+            "users_count": users_count,
+            "ratings_count": ratings_count,
             "user_ids": sorted(user_id_to_username.keys()),
+            "user_layout": args.user_layout,
+            "rating_ids": rating_ids,
         },
     )
 
-    print(f"Generated users JSON: {users_path}")
-    print(f"Generated ratings JSON: {ratings_path}")
+    print(f"Generated users {args.output_format.upper()}: {users_path}")
+    print(f"Generated ratings {args.output_format.upper()}: {ratings_path}")
     print(f"Generated manifest JSON: {manifest_path}")
-    print(f"Total: {len(user_documents)} user documents, {len(rating_documents)} rating documents")
+    print(f"Total: {users_count} user documents, {ratings_count} rating documents")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import argparse
-import csv
 import sys
 from pathlib import Path
 
@@ -12,6 +11,10 @@ ROOT = Path(__file__).resolve().parents[1]
 INPUT_DIR = ROOT / "data-import" / "output"
 OUTPUT_DIR = ROOT / "dml" / "seeds"
 
+sys.path.insert(0, str(ROOT / "data-import"))
+from lookup_store import DISTINCT_SUFFIX, open_lookup_store  # noqa: E402
+from seed_sql import DEFAULT_ROWS_PER_INSERT, write_copy_data, write_insert_sql  # noqa: E402
+
 
 MAPPINGS = [
     # number, source filename, table name, value column
@@ -35,10 +38,6 @@ MAPPINGS = [
 ]
 
 
-def sql_escape(value: str) -> str:
-    return value.replace("'", "''")
-
-
 def should_enable_tqdm(mode: str) -> bool:
     if mode == "off":
         return False
@@ -55,90 +54,75 @@ def parse_args() -> argparse.Namespace:
         default="detailed",
         help="Progress display mode (default: detailed).",
     )
+    parser.add_argument(
+        "--format",
+        choices=("sql", "copy"),
+        default="sql",
+        help=(
+            "Seed file format: INSERT statements (.sql) or PostgreSQL COPY text data (.copy), "
+            "loaded with run-sql.py --format copy (default: sql)."
+        ),
+    )
+    parser.add_argument(
+        "--rows-per-insert",
+        type=int,
+        default=DEFAULT_ROWS_PER_INSERT,
+        help=(
+            "Maximum rows per INSERT statement in .sql seed files; 0 writes each table as a single "
+            f"statement (default: {DEFAULT_ROWS_PER_INSERT})."
+        ),
+    )
     return parser.parse_args()
 
 
-def read_distinct_values(file_path: Path, show_progress: bool) -> list[tuple[int, str]]:
-    rows: list[tuple[int, str]] = []
-    with file_path.open("r", encoding="utf-8", newline="") as handle:
-        total_rows = max(sum(1 for _ in handle) - 1, 0)
-        handle.seek(0)
-        reader = csv.DictReader(handle)
-        required = {"id", "value"}
-        headers = set(reader.fieldnames or [])
-        if not required.issubset(headers):
-            raise ValueError(f"CSV must contain columns {sorted(required)}: {file_path}")
-
-        for row in tqdm(
-            reader,
-            total=total_rows,
-            desc=f"Reading {file_path.name}",
-            unit="row",
-            disable=not show_progress,
-        ):
-            raw_id = (row.get("id") or "").strip()
-            raw_value = (row.get("value") or "").strip()
-            if not raw_id or not raw_value:
-                continue
-            try:
-                parsed_id = int(raw_id)
-            except ValueError as exc:
-                raise ValueError(f"Invalid id '{raw_id}' in {file_path}") from exc
-            rows.append((parsed_id, raw_value))
-    return rows
-
-
-def render_seed_sql(table_name: str, value_column: str, rows: list[tuple[int, str]]) -> str:
-    header = [
-        f"-- Seed data for table: {table_name}",
-        "-- Generated by dml/generate_lookup_details_seeds.py",
-        "",
-    ]
-
-    if not rows:
-        header.append(f"-- No values found for {table_name}; nothing to insert.")
-        header.append("")
-        return "\n".join(header)
-
-    tuples = [
-        f"    ({row_id}, '{sql_escape(value)}')"
-        for row_id, value in rows
-    ]
-
-    body = [
-        f"INSERT INTO {table_name} (id, {value_column}) VALUES",
-        ",\n".join(tuples),
-        "ON CONFLICT (id) DO NOTHING;",
-        "",
-    ]
-
-    return "\n".join(header + body)
-
-
 def main() -> None:
     args = parse_args()
     show_progress = should_enable_tqdm(args.progress)
+    if args.rows_per_insert < 0:
+        raise SystemExit("Error: --rows-per-insert must be 0 or greater")
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    for number, source_filename, table_name, value_column in tqdm(
-        MAPPINGS,
-        desc="Generating lookup seeds",
-        unit="table",
-        disable=not show_progress,
-    ):
-        source_path = INPUT_DIR / source_filename
-        if not source_path.exists():
-            raise FileNotFoundError(f"Missing source file: {source_path}")
-
-        rows = read_distinct_values(source_path, show_progress=show_progress)
-        sql = render_seed_sql(table_name, value_column, rows)
-
-        out_filename = f"{number}_{table_name}_seed.sql"
-        out_path = OUTPUT_DIR / out_filename
-        out_path.write_text(sql, encoding="utf-8")
-
-        print(f"Wrote {out_path.relative_to(ROOT)} ({len(rows)} rows)")
+    with open_lookup_store(output_dir=INPUT_DIR, show_progress=show_progress) as lookups:
+        for number, source_filename, table_name, value_column in tqdm(
+            MAPPINGS,
+            desc="Generating lookup seeds",
+            unit="table",
+            disable=not show_progress,
+        ):
+            source_path = INPUT_DIR / source_filename
+            if not source_path.exists():
+                raise FileNotFoundError(f"Missing source file: {source_path}")
+
+            rows = lookups.values(source_filename.removesuffix(DISTINCT_SUFFIX))
+
+            out_filename = f"{number}_{table_name}_seed.{args.format}"
+            out_path = OUTPUT_DIR / out_filename
+            generated_by = "dml/generate_lookup_details_seeds.py"
+            empty_comment = f"-- No values found for {table_name}; nothing to insert."
+            if args.format == "copy":
+                write_copy_data(
+                    out_path,
+                    table_name=table_name,
+                    columns=["id", value_column],
+                    rows=rows,
+                    conflict_columns="id",
+                    generated_by=generated_by,
+                    empty_comment=empty_comment,
+                )
+            else:
+                write_insert_sql(
+                    out_path,
+                    table_name=table_name,
+                    columns=["id", value_column],
+                    rows=rows,
+                    on_conflict="ON CONFLICT (id) DO NOTHING;",
+                    generated_by=generated_by,
+                    empty_comment=empty_comment,
+                    rows_per_insert=args.rows_per_insert,
+                )
+
+            print(f"Wrote {out_path.relative_to(ROOT)} ({len(rows)} rows)")
 
 
 if __name__ == "__main__":
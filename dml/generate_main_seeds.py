@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import argparse
-import ast
 import csv
+import hashlib
 import json
+import os
 import random
 import sys
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 
 from tqdm import tqdm
@@ -17,6 +18,17 @@ DATA_IMPORT_DIR = ROOT / "data-import"
 DATASETS_DIR = DATA_IMPORT_DIR / "datasets"
 OUTPUT_DIR = DATA_IMPORT_DIR / "output"
 SEEDS_DIR = ROOT / "dml" / "seeds"
+MANIFEST_PATH = SEEDS_DIR / "main_seeds_manifest.json"
+# Manifest of seed files written but not yet loaded; --promote-manifest makes it current.
+PENDING_MANIFEST_PATH = SEEDS_DIR / "main_seeds_manifest.pending.json"
+MANIFEST_VERSION = 1
+
+sys.path.insert(0, str(DATA_IMPORT_DIR))
+from dataset_cache import open_dataset, read_dataset_frame  # noqa: E402
+from list_literals import parse_list_literal  # noqa: E402
+from lookup_store import open_lookup_store  # noqa: E402
+from read_progress import track_read_progress  # noqa: E402
+from seed_sql import DEFAULT_ROWS_PER_INSERT, conflict_clause, write_copy_data, write_insert_sql  # noqa: E402
 
 
 ANIME_COLUMNS = [
@@ -106,6 +118,55 @@ COUNTRY_ALIASES = {
     "UK": "United Kingdom",
 }
 
+DETAILS_COLUMNS = [
+    "mal_id",
+    "title",
+    "title_japanese",
+    "url",
+    "image_url",
+    "type",
+    "status",
+    "source",
+    "rating",
+    "season",
+    "score",
+    "scored_by",
+    "start_date",
+    "end_date",
+    "synopsis",
+    "rank",
+    "popularity",
+    "members",
+    "favorites",
+    "episodes",
+    "year",
+    "genres",
+    "explicit_genres",
+    "licensors",
+    "demographics",
+    "producers",
+    "streaming",
+    "studios",
+    "themes",
+]
+STATS_INT_COLUMNS = ["watching", "completed", "on_hold", "dropped", "plan_to_watch", "total"]
+STATS_FLOAT_COLUMNS = [
+    f"score_{score_idx}_{kind}" for score_idx in range(1, 11) for kind in ("votes", "percentage")
+]
+# details.csv scalar lookup columns; each maps to the "<column>_id" anime column.
+SCALAR_LOOKUP_COLUMNS = ("type", "rating", "season", "source", "status")
+# details.csv list columns and the lookup table their values belong to.
+LIST_LOOKUP_COLUMNS = (
+    ("genres", "genre"),
+    ("explicit_genres", "explicit_genre"),
+    ("licensors", "licensor"),
+    ("demographics", "demographic"),
+    ("producers", "producer"),
+    ("streaming", "streaming_service"),
+    ("studios", "studio"),
+    ("themes", "theme"),
+)
+
 
 class GeneratorError(Exception):
     pass
@@ -133,6 +194,63 @@ def parse_args() -> argparse.Namespace:
         default="detailed",
         help="Progress display mode (default: detailed).",
     )
+    parser.add_argument(
+        "--engine",
+        choices=("python", "pandas"),
+        default="python",
+        help=(
+            "How details.csv and stats.csv are joined into anime rows: row by row, or column "
+            "at a time with NumPy/pandas (requires numpy and pandas). Output is identical (default: python)."
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        choices=("sql", "copy"),
+        default="sql",
+        help=(
+            "Seed file format: INSERT statements (.sql) or PostgreSQL COPY text data (.copy), "
+            "loaded with run-sql.py --format copy (default: sql)."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only emit rows that are new or changed since the previous run recorded in "
+            "dml/seeds/main_seeds_manifest.json, with ON CONFLICT DO UPDATE. The previous anime and "
+            "app users are kept and --n grows the subset."
+        ),
+    )
+    parser.add_argument(
+        "--promote-manifest",
+        action="store_true",
+        help=(
+            "Only promote the pending manifest of the last --incremental run to "
+            "dml/seeds/main_seeds_manifest.json, once run-sql.py has loaded its seed files, then exit."
+        ),
+    )
+    parser.add_argument(
+        "--direct-load",
+        action="store_true",
+        help=(
+            "Load the rows straight into PostgreSQL with binary COPY instead of writing seed files. "
+            "The lookup tables (001-017) must already be loaded."
+        ),
+    )
+    parser.add_argument(
+        "--sql-connection-string",
+        default=None,
+        help="PostgreSQL connection string for --direct-load. Falls back to SQL_DATABASE_URL if omitted.",
+    )
+    parser.add_argument(
+        "--rows-per-insert",
+        type=int,
+        default=DEFAULT_ROWS_PER_INSERT,
+        help=(
+            "Maximum rows per INSERT statement in .sql seed files; 0 writes each table as a single "
+            f"statement (default: {DEFAULT_ROWS_PER_INSERT})."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -165,16 +283,8 @@ def parse_list_value(raw: str) -> list[str]:
     if not text.startswith("["):
         return [text]
 
-    parsed: object | None = None
-    try:
-        parsed = json.loads(text)
-    except json.JSONDecodeError:
-        try:
-            parsed = ast.literal_eval(text)
-        except (SyntaxError, ValueError):
-            return []
-
-    if not isinstance(parsed, list):
+    parsed = parse_list_literal(text)
+    if parsed is None:
         return []
 
     values: list[str] = []
@@ -185,54 +295,6 @@ def parse_list_value(raw: str) -> list[str]:
     return values
 
 
-def sql_escape(value: str) -> str:
-    return value.replace("'", "''")
-
-
-def sql_literal(value: object) -> str:
-    if value is None:
-        return "NULL"
-    if isinstance(value, str):
-        return f"'{sql_escape(value)}'"
-    if isinstance(value, bool):
-        return "TRUE" if value else "FALSE"
-    return str(value)
-
-
-def count_data_rows(file_path: Path) -> int:
-    with file_path.open("r", encoding="utf-8") as handle:
-        return max(sum(1 for _ in handle) - 1, 0)
-
-
-def read_lookup_map(file_path: Path, show_progress: bool) -> dict[str, int]:
-    mapping: dict[str, int] = {}
-    total_rows = count_data_rows(file_path)
-    with file_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required = {"id", "value"}
-        headers = set(reader.fieldnames or [])
-        if not required.issubset(headers):
-            raise GeneratorError(f"Lookup CSV must contain columns {sorted(required)}: {file_path}")
-
-        for row in tqdm(
-            reader,
-            total=total_rows,
-            desc=f"Lookup {file_path.name}",
-            unit="row",
-            disable=not show_progress,
-        ):
-            raw_id = (row.get("id") or "").strip()
-            raw_value = (row.get("value") or "").strip()
-            if not raw_id or not raw_value:
-                continue
-            try:
-                value_id = int(raw_id)
-            except ValueError as exc:
-                raise GeneratorError(f"Invalid lookup id '{raw_id}' in {file_path}") from exc
-            mapping[raw_value] = value_id
-    return mapping
-
-
 def parse_int(raw: str | None, default: int | None = None) -> int | None:
     if raw is None:
         return default
@@ -317,31 +379,36 @@ def sample_app_users(
     gender_map: dict[str, int],
     country_map: dict[str, int],
     show_progress: bool,
-) -> list[tuple[object, ...]]:
+    keep_ids: set[int] | None = None,
+) -> tuple[list[tuple[object, ...]], list[int]]:
+    """Reservoir-sample n profiles; rows whose index is in keep_ids are always taken.
+
+    Returns the app_user rows and the sampled row indexes (the app_user ids),
+    including samples skipped for missing values.
+    """
     profiles_path = DATASETS_DIR / "profiles.csv"
     rng = random.Random(None if random_seed is None else random_seed + 1000)
+    keep_ids = keep_ids or set()
+    if len(keep_ids) > n:
+        raise GeneratorError(f"Requested N={n}, but the previous run already selected {len(keep_ids)} app users")
+    kept: list[tuple[int, dict[str, str]]] = []
+    sample_size = n - len(keep_ids)
 
     reservoir: list[tuple[int, dict[str, str]]] = []
     total_rows = 0
 
-    progress_total_rows = count_data_rows(profiles_path)
     total_rows = 0
-    with profiles_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"username", "gender", "birthday", "location", "joined"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"username", "gender", "birthday", "location", "joined"}
+    with open_dataset(
+        profiles_path,
+        required_cols,
+        desc="Sampling app users",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {profiles_path}")
 
-        for row_idx, row in enumerate(
-            tqdm(
-                reader,
-                total=progress_total_rows,
-                desc="Sampling app users",
-                unit="row",
-                disable=not show_progress,
-            ),
-            start=1,
-        ):
+        for row_idx, row in enumerate(reader, start=1):
             total_rows += 1
             snapshot = {
                 "username": (row.get("username") or "").strip(),
@@ -351,19 +418,23 @@ def sample_app_users(
                 "joined": (row.get("joined") or "").strip(),
             }
 
-            if len(reservoir) < n:
+            if row_idx in keep_ids:
+                kept.append((row_idx, snapshot))
+                continue
+            if len(reservoir) < sample_size:
                 reservoir.append((row_idx, snapshot))
             else:
-                replacement_index = rng.randint(1, row_idx)
-                if replacement_index <= n:
+                replacement_index = rng.randint(1, row_idx - len(kept))
+                if replacement_index <= sample_size:
                     reservoir[replacement_index - 1] = (row_idx, snapshot)
 
     if total_rows < n:
         raise GeneratorError(f"Requested N={n} app users, but only {total_rows} profile rows are available")
 
+    sampled = sorted(kept + reservoir, key=lambda item: item[0])
     app_users: list[tuple[object, ...]] = []
     skipped = 0
-    for row_idx, row in sorted(reservoir, key=lambda item: item[0]):
+    for row_idx, row in sampled:
         username = normalize_text(row.get("username"))
         joined_date = parse_date(row.get("joined"))
         country_id = country_map.get(normalize_country_name(row.get("location")) or "")
@@ -380,24 +451,28 @@ def sample_app_users(
     if skipped:
         print(f"Warning: skipped {skipped} app_user rows due to missing required values")
 
-    return app_users
+    return app_users, [row_idx for row_idx, _ in sampled]
 
 
-def choose_anime_ids(n: int, random_seed: int | None, show_progress: bool) -> set[int]:
+def choose_anime_ids(
+    n: int,
+    random_seed: int | None,
+    show_progress: bool,
+    keep_ids: set[int] | None = None,
+) -> set[int]:
+    """Sample n anime IDs; the still-available IDs in keep_ids are always included."""
     source_path = OUTPUT_DIR / "details" / "mal_id_distinct.csv"
     ids: list[int] = []
 
-    total_rows = count_data_rows(source_path)
     with source_path.open("r", encoding="utf-8", newline="") as handle:
         reader = csv.DictReader(handle)
         if "value" not in (reader.fieldnames or []):
             raise GeneratorError(f"Missing 'value' column in {source_path}")
-        for row in tqdm(
+        for row in track_read_progress(
             reader,
-            total=total_rows,
+            handle,
             desc="Reading anime ID pool",
-            unit="row",
-            disable=not show_progress,
+            show_progress=show_progress,
         ):
             value = parse_int(row.get("value"))
             if value is not None:
@@ -406,104 +481,469 @@ def choose_anime_ids(n: int, random_seed: int | None, show_progress: bool) -> se
     if n > len(ids):
         raise GeneratorError(f"Requested N={n}, but only {len(ids)} anime IDs are available")
 
+    kept = {anime_id for anime_id in ids if anime_id in keep_ids} if keep_ids else set()
+    if len(kept) > n:
+        raise GeneratorError(f"Requested N={n}, but the previous run already selected {len(kept)} anime IDs")
+    candidates = [anime_id for anime_id in ids if anime_id not in kept] if kept else ids
     rng = random.Random(random_seed)
-    return set(rng.sample(ids, n))
+    return kept | set(rng.sample(candidates, n - len(kept)))
+
+
+def read_anime_details(
+    details_path: Path,
+    selected_anime_ids: set[int],
+    scalar_maps: dict[str, dict[str, int]],
+    list_maps: dict[str, dict[str, int]],
+    show_progress: bool,
+) -> tuple[dict[int, dict[str, object]], dict[str, set[tuple[int, int]]], dict[str, int]]:
+    anime_base_rows: dict[int, dict[str, object]] = {}
+    list_rows: dict[str, set[tuple[int, int]]] = {column: set() for column, _ in LIST_LOOKUP_COLUMNS}
+    unknown_list_values = {column: 0 for column, _ in LIST_LOOKUP_COLUMNS}
+
+    required_cols = set(DETAILS_COLUMNS)
+    with open_dataset(
+        details_path,
+        required_cols,
+        desc="Reading anime details",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
+            raise GeneratorError(f"Missing required columns in {details_path}")
+
+        for row in reader:
+            anime_id = parse_int(row.get("mal_id"))
+            if anime_id is None or anime_id not in selected_anime_ids:
+                continue
+
+            record: dict[str, object] = {"id": anime_id}
+            for column in SCALAR_LOOKUP_COLUMNS:
+                record[f"{column}_id"] = scalar_maps[column].get(normalize_text(row.get(column)) or "")
+            record.update(
+                {
+                    "title": normalize_text(row.get("title")) or "",
+                    "title_japanese": normalize_text(row.get("title_japanese"))
+                    or normalize_text(row.get("title"))
+                    or "",
+                    "url": normalize_text(row.get("url")) or "",
+                    "image_url": normalize_text(row.get("image_url")) or "",
+                    "score": parse_float(row.get("score"), default=0.0) or 0.0,
+                    "scored_by": parse_float(row.get("scored_by")),
+                    "start_date": parse_date(row.get("start_date")),
+                    "end_date": parse_date(row.get("end_date")),
+                    "synopsis": normalize_text(row.get("synopsis")),
+                    "rank": parse_float(row.get("rank")),
+                    "popularity": parse_int(row.get("popularity"), default=0) or 0,
+                    "members": parse_int(row.get("members"), default=0) or 0,
+                    "favorites": parse_int(row.get("favorites"), default=0) or 0,
+                    "episodes": parse_float(row.get("episodes")),
+                    "year": parse_float(row.get("year")),
+                }
+            )
+
+            for column, _ in LIST_LOOKUP_COLUMNS:
+                lookup = list_maps[column]
+                for name in parse_list_value(row.get(column) or ""):
+                    lookup_id = lookup.get(name)
+                    if lookup_id is None:
+                        unknown_list_values[column] += 1
+                        continue
+                    list_rows[column].add((anime_id, lookup_id))
+
+            anime_base_rows[anime_id] = record
+
+    return anime_base_rows, list_rows, unknown_list_values
+
+
+def read_anime_stats(
+    stats_path: Path,
+    anime_base_rows: dict[int, dict[str, object]],
+    show_progress: bool,
+) -> set[int]:
+    stats_found: set[int] = set()
+    required_cols = {"mal_id", *STATS_INT_COLUMNS, *STATS_FLOAT_COLUMNS}
+    with open_dataset(
+        stats_path,
+        required_cols,
+        desc="Reading anime stats",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
+            raise GeneratorError(f"Missing required columns in {stats_path}")
+
+        for row in reader:
+            anime_id = parse_int(row.get("mal_id"))
+            if anime_id is None or anime_id not in anime_base_rows:
+                continue
+
+            record = anime_base_rows[anime_id]
+            for column in STATS_INT_COLUMNS:
+                record[column] = parse_int(row.get(column), default=0) or 0
+            for column in STATS_FLOAT_COLUMNS:
+                record[column] = parse_float(row.get(column), default=0.0) or 0.0
+
+            stats_found.add(anime_id)
+
+    return stats_found
+
+
+def parse_column(values: list[str | None], parse) -> list[object]:
+    """Apply parse once per distinct cell value and broadcast it back to the column."""
+    parsed = {value: parse(value) for value in dict.fromkeys(values)}
+    return [parsed[value] for value in values]
+
+
+def match_id_column(values: list[str | None], wanted: set[int]):
+    """Parse a column of integer ids and return (ids, mask of rows whose id is in wanted)."""
+    import numpy as np
+
+    parsed = parse_column(values, parse_int)
+    present = np.fromiter((value is not None for value in parsed), dtype=bool, count=len(parsed))
+    ids = np.array([0 if value is None else value for value in parsed], dtype=np.int64)
+    wanted_ids = np.fromiter(wanted, dtype=np.int64, count=len(wanted))
+    return ids, present & np.isin(ids, wanted_ids)
+
+
+def read_frame_or_fail(csv_path: Path, columns: list[str]):
+    try:
+        frame = read_dataset_frame(csv_path, columns)
+    except ImportError as exc:
+        raise GeneratorError("--engine pandas requires numpy and pandas: pip install numpy pandas") from exc
+    if not set(columns).issubset(frame.columns):
+        raise GeneratorError(f"Missing required columns in {csv_path}")
+    return frame
+
+
+def read_anime_details_vectorized(
+    details_path: Path,
+    selected_anime_ids: set[int],
+    scalar_maps: dict[str, dict[str, int]],
+    list_maps: dict[str, dict[str, int]],
+) -> tuple[dict[int, dict[str, object]], dict[str, set[tuple[int, int]]], dict[str, int]]:
+    """Column-at-a-time equivalent of read_anime_details()."""
+    frame = read_frame_or_fail(details_path, DETAILS_COLUMNS)
+    ids, mask = match_id_column(frame["mal_id"].tolist(), selected_anime_ids)
+    matches = frame[mask]
+    match_ids = ids[mask].tolist()
+
+    # Junction rows come from every matching row, including duplicate ids.
+    list_rows: dict[str, set[tuple[int, int]]] = {}
+    unknown_list_values: dict[str, int] = {}
+    for column, _ in LIST_LOOKUP_COLUMNS:
+        lookup = list_maps[column]
+
+        def map_cell(raw: str | None, lookup: dict[str, int] = lookup) -> tuple[list[int], int]:
+            names = parse_list_value(raw or "")
+            lookup_ids = [lookup[name] for name in names if name in lookup]
+            return lookup_ids, len(names) - len(lookup_ids)
+
+        rows: set[tuple[int, int]] = set()
+        unknown = 0
+        for anime_id, (lookup_ids, missing) in zip(match_ids, parse_column(matches[column].tolist(), map_cell)):
+            rows.update((anime_id, lookup_id) for lookup_id in lookup_ids)
+            unknown += missing
+        list_rows[column] = rows
+        unknown_list_values[column] = unknown
+
+    # As in the row-by-row path, the last row wins for the anime record itself.
+    last = matches.assign(_id=match_ids).drop_duplicates("_id", keep="last")
+    record_columns: dict[str, list[object]] = {"id": last["_id"].tolist()}
+    for column in SCALAR_LOOKUP_COLUMNS:
+        lookup = scalar_maps[column]
+        record_columns[f"{column}_id"] = parse_column(
+            last[column].tolist(),
+            lambda raw, lookup=lookup: lookup.get(normalize_text(raw) or ""),
+        )
+
+    titles = parse_column(last["title"].tolist(), normalize_text)
+    record_columns["title"] = [title or "" for title in titles]
+    record_columns["title_japanese"] = [
+        japanese or title or ""
+        for japanese, title in zip(parse_column(last["title_japanese"].tolist(), normalize_text), titles)
+    ]
+    for column in ("url", "image_url"):
+        record_columns[column] = [value or "" for value in parse_column(last[column].tolist(), normalize_text)]
+    record_columns["synopsis"] = parse_column(last["synopsis"].tolist(), normalize_text)
+    record_columns["score"] = parse_column(last["score"].tolist(), lambda raw: parse_float(raw, default=0.0) or 0.0)
+    for column in ("scored_by", "rank", "episodes", "year"):
+        record_columns[column] = parse_column(last[column].tolist(), parse_float)
+    for column in ("start_date", "end_date"):
+        record_columns[column] = parse_column(last[column].tolist(), parse_date)
+    for column in ("popularity", "members", "favorites"):
+        record_columns[column] = parse_column(last[column].tolist(), lambda raw: parse_int(raw, default=0) or 0)
+
+    names = list(record_columns)
+    anime_base_rows = {
+        values[0]: dict(zip(names, values)) for values in zip(*record_columns.values())
+    }
+    return anime_base_rows, list_rows, unknown_list_values
+
+
+def read_anime_stats_vectorized(stats_path: Path, anime_base_rows: dict[int, dict[str, object]]) -> set[int]:
+    """Column-at-a-time equivalent of read_anime_stats()."""
+    frame = read_frame_or_fail(stats_path, ["mal_id", *STATS_INT_COLUMNS, *STATS_FLOAT_COLUMNS])
+    ids, mask = match_id_column(frame["mal_id"].tolist(), set(anime_base_rows))
+    matches = frame[mask]
+    match_ids = ids[mask].tolist()
+
+    stats_columns: dict[str, list[object]] = {}
+    for column in STATS_INT_COLUMNS:
+        stats_columns[column] = parse_column(matches[column].tolist(), lambda raw: parse_int(raw, default=0) or 0)
+    for column in STATS_FLOAT_COLUMNS:
+        stats_columns[column] = parse_column(
+            matches[column].tolist(),
+            lambda raw: parse_float(raw, default=0.0) or 0.0,
+        )
+
+    # Rows are applied in file order so a duplicated mal_id keeps its last stats row.
+    names = list(stats_columns)
+    for anime_id, values in zip(match_ids, zip(*stats_columns.values())):
+        anime_base_rows[anime_id].update(zip(names, values))
+    return set(match_ids)
+
+
+def load_manifest(path: Path) -> dict[str, object] | None:
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise GeneratorError(f"Invalid run manifest {path}: {exc}") from exc
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise GeneratorError(f"Unsupported run manifest version in {path}; delete it for a full run")
+    return manifest
 
 
-def render_insert_sql(
+def diff_rows(
+    rows: list[tuple[object, ...]],
+    key_indexes: list[int],
+    previous_hashes: dict[str, str],
+) -> tuple[list[tuple[object, ...]], dict[str, str], int, int]:
+    """Return the new or changed rows, the hash of every row by key, and the new/changed counts.
+
+    Keys and hashes are JSON renderings of the key columns and of the whole
+    row, so they survive the manifest round trip unchanged.
+    """
+    delta: list[tuple[object, ...]] = []
+    hashes: dict[str, str] = {}
+    new_rows = 0
+    changed_rows = 0
+    for row in rows:
+        key = json.dumps([row[index] for index in key_indexes], ensure_ascii=False, separators=(",", ":"))
+        if key in hashes:
+            continue  # ON CONFLICT DO NOTHING kept the first row for a key; so does the delta
+        row_json = json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.blake2b(row_json.encode("utf-8"), digest_size=8).hexdigest()
+        hashes[key] = digest
+        previous = previous_hashes.get(key)
+        if previous == digest:
+            continue
+        if previous is None:
+            new_rows += 1
+        else:
+            changed_rows += 1
+        delta.append(row)
+    return delta, hashes, new_rows, changed_rows
+
+
+def write_manifest(path: Path, manifest: dict[str, object]) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def promote_manifest() -> None:
+    if not PENDING_MANIFEST_PATH.exists():
+        raise GeneratorError(f"No pending manifest to promote: {PENDING_MANIFEST_PATH.relative_to(ROOT)}")
+    os.replace(PENDING_MANIFEST_PATH, MANIFEST_PATH)
+    print(f"Promoted {PENDING_MANIFEST_PATH.relative_to(ROOT)} to {MANIFEST_PATH.relative_to(ROOT)}")
+
+
+def load_env_variables() -> None:
+    env_path = ROOT / ".env.local"
+    if env_path.exists():
+        with env_path.open(encoding="utf-8") as env_file:
+            for line in env_file:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                key, sep, value = line.partition("=")
+                if sep:
+                    os.environ[key.strip()] = os.path.expandvars(value.strip())
+
+
+def resolve_sql_connection_string(connection_string: str | None) -> str:
+    if connection_string:
+        return connection_string
+    database_url = os.getenv("SQL_DATABASE_URL")
+    if database_url:
+        return database_url
+    raise GeneratorError(
+        "Missing PostgreSQL connection string. Pass it with --sql-connection-string "
+        "or set SQL_DATABASE_URL environment variable."
+    )
+
+
+def copy_rows_binary(
+    cursor,
     table_name: str,
     columns: list[str],
     rows: list[tuple[object, ...]],
-    conflict_clause: str,
-    generated_by: str,
-) -> str:
-    header = [
-        f"-- Seed data for table: {table_name}",
-        f"-- Generated by {generated_by}",
-        "",
-    ]
-
-    if not rows:
-        return "\n".join(header + [f"-- No rows generated for {table_name}.", ""])
+    conflict_columns: str,
+    update_columns: list[str] | None = None,
+) -> int:
+    """Binary-COPY rows into table_name, skipping existing keys; return the written count.
+
+    Rows go through a temporary staging table and INSERT ... ON CONFLICT DO
+    NOTHING (DO UPDATE of update_columns for delta runs), like the seed files. Dates are kept as ISO strings while
+    generating, so they are converted for the binary date encoder here.
+    """
+    from psycopg import sql
+
+    table = sql.Identifier(table_name)
+    staging = sql.Identifier(f"{table_name}_staging")
+    column_list = sql.SQL(", ").join(sql.Identifier(name) for name in columns)
+    conflict_list = sql.SQL(", ").join(sql.Identifier(name.strip()) for name in conflict_columns.split(","))
+
+    cursor.execute(sql.SQL("CREATE TEMPORARY TABLE {} (LIKE {} INCLUDING DEFAULTS)").format(staging, table))
+    cursor.execute(sql.SQL("SELECT {} FROM {} LIMIT 0").format(column_list, staging))
+    type_names = [column.type_display for column in cursor.description]
+    type_oids = [column.type_code for column in cursor.description]
+    date_indexes = [index for index, name in enumerate(type_names) if name == "date"]
+
+    with cursor.copy(sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(staging, column_list)) as copy:
+        copy.set_types(type_oids)
+        for row in rows:
+            if date_indexes:
+                values = list(row)
+                for index in date_indexes:
+                    if values[index] is not None:
+                        values[index] = date.fromisoformat(values[index])
+                row = tuple(values)
+            copy.write_row(row)
+
+    if update_columns:
+        action = sql.SQL("DO UPDATE SET {}").format(
+            sql.SQL(", ").join(
+                sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(name), sql.Identifier(name)) for name in update_columns
+            )
+        )
+    else:
+        action = sql.SQL("DO NOTHING")
+    cursor.execute(
+        sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT ({}) {}").format(
+            table, column_list, column_list, staging, conflict_list, action
+        )
+    )
+    inserted = cursor.rowcount
+    cursor.execute(sql.SQL("DROP TABLE {}").format(staging))
+    return inserted
 
-    rendered_rows = [
-        "    (" + ", ".join(sql_literal(value) for value in row) + ")"
-        for row in rows
-    ]
 
-    body = [
-        f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES",
-        ",\n".join(rendered_rows),
-        conflict_clause,
-        "",
-    ]
+def load_seed_tables(
+    connection_string: str,
+    seed_files: list[tuple[str, str, list[str], list[tuple[object, ...]], str]],
+    show_progress: bool,
+    update_columns: dict[str, list[str]] | None = None,
+) -> None:
+    """Load every seed table over one connection and transaction, in seed_files (FK) order."""
+    import psycopg
 
-    return "\n".join(header + body)
+    try:
+        with psycopg.connect(connection_string) as connection:
+            with connection.cursor() as cursor:
+                for _number, table_name, columns, rows, conflict_columns in tqdm(
+                    seed_files,
+                    desc="Loading seed tables",
+                    unit="table",
+                    disable=not show_progress,
+                ):
+                    if not rows:
+                        print(f"Loaded {table_name} (0 rows)")
+                        continue
+                    try:
+                        inserted = copy_rows_binary(
+                            cursor,
+                            table_name,
+                            columns,
+                            rows,
+                            conflict_columns,
+                            (update_columns or {}).get(table_name),
+                        )
+                    except psycopg.Error as exc:
+                        raise GeneratorError(f"Failed loading {table_name}: {exc}") from exc
+                    print(f"Loaded {table_name} ({inserted} of {len(rows)} rows written)")
+    except psycopg.OperationalError as exc:
+        raise GeneratorError(f"Could not connect to PostgreSQL: {exc}") from exc
 
 
 def generate() -> None:
     args = parse_args()
+    if args.promote_manifest:
+        promote_manifest()
+        return
     show_progress = should_enable_tqdm(args.progress)
     n = args.n if args.n is not None else prompt_for_n()
 
     if n <= 0:
         raise GeneratorError("N must be greater than 0")
-
-    selected_anime_ids = choose_anime_ids(n, args.seed, show_progress=show_progress)
-    print(f"Selected {len(selected_anime_ids)} anime IDs")
-
-    type_map = read_lookup_map(OUTPUT_DIR / "details" / "type_distinct.csv", show_progress=show_progress)
-    rating_map = read_lookup_map(OUTPUT_DIR / "details" / "rating_distinct.csv", show_progress=show_progress)
-    season_map = read_lookup_map(OUTPUT_DIR / "details" / "season_distinct.csv", show_progress=show_progress)
-    source_map = read_lookup_map(OUTPUT_DIR / "details" / "source_distinct.csv", show_progress=show_progress)
-    status_map = read_lookup_map(OUTPUT_DIR / "details" / "status_distinct.csv", show_progress=show_progress)
-    genre_map = read_lookup_map(OUTPUT_DIR / "details" / "genres_distinct.csv", show_progress=show_progress)
-    explicit_genre_map = read_lookup_map(
-        OUTPUT_DIR / "details" / "explicit_genres_distinct.csv",
-        show_progress=show_progress,
-    )
-    licensor_map = read_lookup_map(OUTPUT_DIR / "details" / "licensors_distinct.csv", show_progress=show_progress)
-    demographic_map = read_lookup_map(
-        OUTPUT_DIR / "details" / "demographics_distinct.csv",
-        show_progress=show_progress,
-    )
-    producer_map = read_lookup_map(OUTPUT_DIR / "details" / "producers_distinct.csv", show_progress=show_progress)
-    streaming_service_map = read_lookup_map(
-        OUTPUT_DIR / "details" / "streaming_distinct.csv",
-        show_progress=show_progress,
-    )
-    studio_map = read_lookup_map(OUTPUT_DIR / "details" / "studios_distinct.csv", show_progress=show_progress)
-    theme_map = read_lookup_map(OUTPUT_DIR / "details" / "themes_distinct.csv", show_progress=show_progress)
-    role_map = read_lookup_map(
-        OUTPUT_DIR / "character_anime_works" / "role_distinct.csv",
-        show_progress=show_progress,
-    )
-    country_map = read_lookup_map(OUTPUT_DIR / "profiles" / "location_distinct.csv", show_progress=show_progress)
-    gender_map = read_lookup_map(OUTPUT_DIR / "profiles" / "gender_distinct.csv", show_progress=show_progress)
-    language_map = read_lookup_map(
-        OUTPUT_DIR / "person_voice_works" / "language_distinct.csv",
+    if args.rows_per_insert < 0:
+        raise GeneratorError("--rows-per-insert must be 0 or greater")
+    connection_string = None
+    if args.direct_load:
+        load_env_variables()
+        connection_string = resolve_sql_connection_string(args.sql_connection_string)
+
+    previous_manifest = load_manifest(MANIFEST_PATH) if args.incremental else None
+    if previous_manifest is not None:
+        print(f"Incremental run against {MANIFEST_PATH.relative_to(ROOT)}")
+    previous_tables: dict[str, dict[str, str]] = (previous_manifest or {}).get("tables", {})
+
+    selected_anime_ids = choose_anime_ids(
+        n,
+        args.seed,
         show_progress=show_progress,
+        keep_ids=set((previous_manifest or {}).get("anime_ids", [])),
     )
+    print(f"Selected {len(selected_anime_ids)} anime IDs")
+
+    try:
+        with open_lookup_store(output_dir=OUTPUT_DIR, show_progress=show_progress) as lookups:
+            type_map = lookups.lookup_map("details/type")
+            rating_map = lookups.lookup_map("details/rating")
+            season_map = lookups.lookup_map("details/season")
+            source_map = lookups.lookup_map("details/source")
+            status_map = lookups.lookup_map("details/status")
+            genre_map = lookups.lookup_map("details/genres")
+            explicit_genre_map = lookups.lookup_map("details/explicit_genres")
+            licensor_map = lookups.lookup_map("details/licensors")
+            demographic_map = lookups.lookup_map("details/demographics")
+            producer_map = lookups.lookup_map("details/producers")
+            streaming_service_map = lookups.lookup_map("details/streaming")
+            studio_map = lookups.lookup_map("details/studios")
+            theme_map = lookups.lookup_map("details/themes")
+            role_map = lookups.lookup_map("character_anime_works/role")
+            country_map = lookups.lookup_map("profiles/location")
+            gender_map = lookups.lookup_map("profiles/gender")
+            language_map = lookups.lookup_map("person_voice_works/language")
+    except ValueError as exc:
+        raise GeneratorError(str(exc)) from exc
 
     character_ids_needed: set[int] = set()
     character_anime_rows_map: dict[tuple[int, int], tuple[int, int, int]] = {}
 
     character_anime_path = DATASETS_DIR / "character_anime_works.csv"
-    character_anime_total_rows = count_data_rows(character_anime_path)
-    with character_anime_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"anime_mal_id", "character_mal_id", "role"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"anime_mal_id", "character_mal_id", "role"}
+    with open_dataset(
+        character_anime_path,
+        required_cols,
+        desc="Reading character-anime works",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {character_anime_path}")
 
         skipped_no_role = 0
-        for row in tqdm(
-            reader,
-            total=character_anime_total_rows,
-            desc="Reading character-anime works",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             anime_id = parse_int(row.get("anime_mal_id"))
             if anime_id is None or anime_id not in selected_anime_ids:
                 continue
@@ -531,20 +971,17 @@ def generate() -> None:
 
     character_rows_map: dict[int, tuple[object, ...]] = {}
     characters_path = DATASETS_DIR / "characters.csv"
-    characters_total_rows = count_data_rows(characters_path)
-    with characters_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"character_mal_id", "url", "name", "name_kanji", "image", "favorites", "about"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"character_mal_id", "url", "name", "name_kanji", "image", "favorites", "about"}
+    with open_dataset(
+        characters_path,
+        required_cols,
+        desc="Reading characters",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {characters_path}")
 
-        for row in tqdm(
-            reader,
-            total=characters_total_rows,
-            desc="Reading characters",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             character_id = parse_int(row.get("character_mal_id"))
             if character_id is None or character_id not in character_ids_needed:
                 continue
@@ -561,243 +998,53 @@ def generate() -> None:
 
     character_rows = sorted(character_rows_map.values(), key=lambda item: int(item[0]))
 
-    anime_base_rows: dict[int, dict[str, object]] = {}
-    anime_genre_rows_set: set[tuple[int, int]] = set()
-    anime_explicit_genre_rows_set: set[tuple[int, int]] = set()
-    anime_licensor_rows_set: set[tuple[int, int]] = set()
-    anime_demographic_rows_set: set[tuple[int, int]] = set()
-    anime_producer_rows_set: set[tuple[int, int]] = set()
-    anime_streaming_service_rows_set: set[tuple[int, int]] = set()
-    anime_studio_rows_set: set[tuple[int, int]] = set()
-    anime_theme_rows_set: set[tuple[int, int]] = set()
-
+    scalar_maps = {
+        "type": type_map,
+        "rating": rating_map,
+        "season": season_map,
+        "source": source_map,
+        "status": status_map,
+    }
+    list_maps = {
+        "genres": genre_map,
+        "explicit_genres": explicit_genre_map,
+        "licensors": licensor_map,
+        "demographics": demographic_map,
+        "producers": producer_map,
+        "streaming": streaming_service_map,
+        "studios": studio_map,
+        "themes": theme_map,
+    }
     details_path = DATASETS_DIR / "details.csv"
-    details_total_rows = count_data_rows(details_path)
-    with details_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {
-            "mal_id",
-            "title",
-            "title_japanese",
-            "url",
-            "image_url",
-            "type",
-            "status",
-            "source",
-            "rating",
-            "season",
-            "score",
-            "scored_by",
-            "start_date",
-            "end_date",
-            "synopsis",
-            "rank",
-            "popularity",
-            "members",
-            "favorites",
-            "episodes",
-            "year",
-            "genres",
-            "explicit_genres",
-            "licensors",
-            "demographics",
-            "producers",
-            "streaming",
-            "studios",
-            "themes",
-        }
-        if not required_cols.issubset(set(reader.fieldnames or [])):
-            raise GeneratorError(f"Missing required columns in {details_path}")
-
-        unknown_genres = 0
-        unknown_explicit_genres = 0
-        unknown_licensors = 0
-        unknown_demographics = 0
-        unknown_producers = 0
-        unknown_streaming_services = 0
-        unknown_studios = 0
-        unknown_themes = 0
-        for row in tqdm(
-            reader,
-            total=details_total_rows,
-            desc="Reading anime details",
-            unit="row",
-            disable=not show_progress,
-        ):
-            anime_id = parse_int(row.get("mal_id"))
-            if anime_id is None or anime_id not in selected_anime_ids:
-                continue
-
-            record: dict[str, object] = {
-                "id": anime_id,
-                "type_id": type_map.get(normalize_text(row.get("type")) or ""),
-                "rating_id": rating_map.get(normalize_text(row.get("rating")) or ""),
-                "season_id": season_map.get(normalize_text(row.get("season")) or ""),
-                "source_id": source_map.get(normalize_text(row.get("source")) or ""),
-                "status_id": status_map.get(normalize_text(row.get("status")) or ""),
-                "title": normalize_text(row.get("title")) or "",
-                "title_japanese": normalize_text(row.get("title_japanese"))
-                or normalize_text(row.get("title"))
-                or "",
-                "url": normalize_text(row.get("url")) or "",
-                "image_url": normalize_text(row.get("image_url")) or "",
-                "score": parse_float(row.get("score"), default=0.0) or 0.0,
-                "scored_by": parse_float(row.get("scored_by")),
-                "start_date": parse_date(row.get("start_date")),
-                "end_date": parse_date(row.get("end_date")),
-                "synopsis": normalize_text(row.get("synopsis")),
-                "rank": parse_float(row.get("rank")),
-                "popularity": parse_int(row.get("popularity"), default=0) or 0,
-                "members": parse_int(row.get("members"), default=0) or 0,
-                "favorites": parse_int(row.get("favorites"), default=0) or 0,
-                "episodes": parse_float(row.get("episodes")),
-                "year": parse_float(row.get("year")),
-            }
-
-            for genre_name in parse_list_value(row.get("genres") or ""):
-                genre_id = genre_map.get(genre_name)
-                if genre_id is None:
-                    unknown_genres += 1
-                    continue
-                anime_genre_rows_set.add((anime_id, genre_id))
-
-            for name in parse_list_value(row.get("explicit_genres") or ""):
-                lookup_id = explicit_genre_map.get(name)
-                if lookup_id is None:
-                    unknown_explicit_genres += 1
-                    continue
-                anime_explicit_genre_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("licensors") or ""):
-                lookup_id = licensor_map.get(name)
-                if lookup_id is None:
-                    unknown_licensors += 1
-                    continue
-                anime_licensor_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("demographics") or ""):
-                lookup_id = demographic_map.get(name)
-                if lookup_id is None:
-                    unknown_demographics += 1
-                    continue
-                anime_demographic_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("producers") or ""):
-                lookup_id = producer_map.get(name)
-                if lookup_id is None:
-                    unknown_producers += 1
-                    continue
-                anime_producer_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("streaming") or ""):
-                lookup_id = streaming_service_map.get(name)
-                if lookup_id is None:
-                    unknown_streaming_services += 1
-                    continue
-                anime_streaming_service_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("studios") or ""):
-                lookup_id = studio_map.get(name)
-                if lookup_id is None:
-                    unknown_studios += 1
-                    continue
-                anime_studio_rows_set.add((anime_id, lookup_id))
-
-            for name in parse_list_value(row.get("themes") or ""):
-                lookup_id = theme_map.get(name)
-                if lookup_id is None:
-                    unknown_themes += 1
-                    continue
-                anime_theme_rows_set.add((anime_id, lookup_id))
-
-            anime_base_rows[anime_id] = record
+    stats_path = DATASETS_DIR / "stats.csv"
 
-    if unknown_genres:
-        print(f"Warning: skipped {unknown_genres} genre values not found in genre lookup")
-    if unknown_explicit_genres:
-        print(
-            f"Warning: skipped {unknown_explicit_genres} explicit_genre values not found in explicit_genre lookup"
+    if args.engine == "pandas":
+        anime_base_rows, list_rows, unknown_list_values = read_anime_details_vectorized(
+            details_path,
+            selected_anime_ids,
+            scalar_maps,
+            list_maps,
         )
-    if unknown_licensors:
-        print(f"Warning: skipped {unknown_licensors} licensor values not found in licensor lookup")
-    if unknown_demographics:
-        print(f"Warning: skipped {unknown_demographics} demographic values not found in demographic lookup")
-    if unknown_producers:
-        print(f"Warning: skipped {unknown_producers} producer values not found in producer lookup")
-    if unknown_streaming_services:
-        print(
-            "Warning: skipped "
-            f"{unknown_streaming_services} streaming_service values not found in streaming_service lookup"
+    else:
+        anime_base_rows, list_rows, unknown_list_values = read_anime_details(
+            details_path,
+            selected_anime_ids,
+            scalar_maps,
+            list_maps,
+            show_progress=show_progress,
         )
-    if unknown_studios:
-        print(f"Warning: skipped {unknown_studios} studio values not found in studio lookup")
-    if unknown_themes:
-        print(f"Warning: skipped {unknown_themes} theme values not found in theme lookup")
-
-    stats_path = DATASETS_DIR / "stats.csv"
-    stats_cols = [
-        "watching",
-        "completed",
-        "on_hold",
-        "dropped",
-        "plan_to_watch",
-        "total",
-        "score_1_votes",
-        "score_1_percentage",
-        "score_2_votes",
-        "score_2_percentage",
-        "score_3_votes",
-        "score_3_percentage",
-        "score_4_votes",
-        "score_4_percentage",
-        "score_5_votes",
-        "score_5_percentage",
-        "score_6_votes",
-        "score_6_percentage",
-        "score_7_votes",
-        "score_7_percentage",
-        "score_8_votes",
-        "score_8_percentage",
-        "score_9_votes",
-        "score_9_percentage",
-        "score_10_votes",
-        "score_10_percentage",
-    ]
-
-    stats_found: set[int] = set()
-    stats_total_rows = count_data_rows(stats_path)
-    with stats_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"mal_id", *stats_cols}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
-            raise GeneratorError(f"Missing required columns in {stats_path}")
 
-        for row in tqdm(
-            reader,
-            total=stats_total_rows,
-            desc="Reading anime stats",
-            unit="row",
-            disable=not show_progress,
-        ):
-            anime_id = parse_int(row.get("mal_id"))
-            if anime_id is None or anime_id not in anime_base_rows:
-                continue
-
-            record = anime_base_rows[anime_id]
-            record["watching"] = parse_int(row.get("watching"), default=0) or 0
-            record["completed"] = parse_int(row.get("completed"), default=0) or 0
-            record["on_hold"] = parse_int(row.get("on_hold"), default=0) or 0
-            record["dropped"] = parse_int(row.get("dropped"), default=0) or 0
-            record["plan_to_watch"] = parse_int(row.get("plan_to_watch"), default=0) or 0
-            record["total"] = parse_int(row.get("total"), default=0) or 0
-
-            for score_idx in range(1, 11):
-                votes_col = f"score_{score_idx}_votes"
-                perc_col = f"score_{score_idx}_percentage"
-                record[votes_col] = parse_float(row.get(votes_col), default=0.0) or 0.0
-                record[perc_col] = parse_float(row.get(perc_col), default=0.0) or 0.0
+    for column, lookup_name in LIST_LOOKUP_COLUMNS:
+        if unknown_list_values[column]:
+            print(
+                f"Warning: skipped {unknown_list_values[column]} {lookup_name} values "
+                f"not found in {lookup_name} lookup"
+            )
 
-            stats_found.add(anime_id)
+    if args.engine == "pandas":
+        stats_found = read_anime_stats_vectorized(stats_path, anime_base_rows)
+    else:
+        stats_found = read_anime_stats(stats_path, anime_base_rows, show_progress=show_progress)
 
     anime_rows: list[tuple[object, ...]] = []
     skipped_anime = 0
@@ -835,55 +1082,52 @@ def generate() -> None:
 
     valid_anime_ids = {int(row[0]) for row in anime_rows}
     anime_genre_rows = sorted(
-        [row for row in anime_genre_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["genres"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_explicit_genre_rows = sorted(
-        [row for row in anime_explicit_genre_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["explicit_genres"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_licensor_rows = sorted(
-        [row for row in anime_licensor_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["licensors"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_demographic_rows = sorted(
-        [row for row in anime_demographic_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["demographics"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_producer_rows = sorted(
-        [row for row in anime_producer_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["producers"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_streaming_service_rows = sorted(
-        [row for row in anime_streaming_service_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["streaming"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_studio_rows = sorted(
-        [row for row in anime_studio_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["studios"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
     anime_theme_rows = sorted(
-        [row for row in anime_theme_rows_set if row[0] in valid_anime_ids],
+        [row for row in list_rows["themes"] if row[0] in valid_anime_ids],
         key=lambda item: (item[0], item[1]),
     )
 
     anime_recommendation_rows_set: set[tuple[int, int]] = set()
     skipped_recommendations = 0
     recommendations_path = DATASETS_DIR / "recommendations.csv"
-    recommendations_total_rows = count_data_rows(recommendations_path)
-    with recommendations_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"mal_id", "recommendation_mal_id"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"mal_id", "recommendation_mal_id"}
+    with open_dataset(
+        recommendations_path,
+        required_cols,
+        desc="Reading recommendations",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {recommendations_path}")
 
-        for row in tqdm(
-            reader,
-            total=recommendations_total_rows,
-            desc="Reading recommendations",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             anime_id = parse_int(row.get("mal_id"))
             recommended_anime_id = parse_int(row.get("recommendation_mal_id"))
             if anime_id is None or recommended_anime_id is None:
@@ -908,20 +1152,17 @@ def generate() -> None:
 
     character_nickname_rows_set: set[tuple[int, str]] = set()
     character_nickname_path = DATASETS_DIR / "character_nicknames.csv"
-    character_nickname_total_rows = count_data_rows(character_nickname_path)
-    with character_nickname_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"character_mal_id", "nickname"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"character_mal_id", "nickname"}
+    with open_dataset(
+        character_nickname_path,
+        required_cols,
+        desc="Reading character nicknames",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {character_nickname_path}")
 
-        for row in tqdm(
-            reader,
-            total=character_nickname_total_rows,
-            desc="Reading character nicknames",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             character_id = parse_int(row.get("character_mal_id"))
             nickname = normalize_text(row.get("nickname"))
             if character_id is None or nickname is None:
@@ -935,21 +1176,18 @@ def generate() -> None:
     person_ids_needed: set[int] = set()
     person_anime_rows_map: dict[tuple[int, int], tuple[int, int, str]] = {}
     person_anime_path = DATASETS_DIR / "person_anime_works.csv"
-    person_anime_total_rows = count_data_rows(person_anime_path)
 
-    with person_anime_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"person_mal_id", "position", "anime_mal_id"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"person_mal_id", "position", "anime_mal_id"}
+    with open_dataset(
+        person_anime_path,
+        required_cols,
+        desc="Reading person-anime works",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {person_anime_path}")
 
-        for row in tqdm(
-            reader,
-            total=person_anime_total_rows,
-            desc="Reading person-anime works",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             anime_id = parse_int(row.get("anime_mal_id"))
             if anime_id is None or anime_id not in valid_anime_ids:
                 continue
@@ -972,26 +1210,23 @@ def generate() -> None:
     person_voice_rows_set: set[tuple[int, int, int, int]] = set()
     skipped_person_voice = 0
     person_voice_path = DATASETS_DIR / "person_voice_works.csv"
-    person_voice_total_rows = count_data_rows(person_voice_path)
 
-    with person_voice_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {
-            "person_mal_id",
-            "anime_mal_id",
-            "character_mal_id",
-            "language",
-        }
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {
+        "person_mal_id",
+        "anime_mal_id",
+        "character_mal_id",
+        "language",
+    }
+    with open_dataset(
+        person_voice_path,
+        required_cols,
+        desc="Reading person voice works",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {person_voice_path}")
 
-        for row in tqdm(
-            reader,
-            total=person_voice_total_rows,
-            desc="Reading person voice works",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             anime_id = parse_int(row.get("anime_mal_id"))
             if anime_id is None or anime_id not in valid_anime_ids:
                 continue
@@ -1018,32 +1253,29 @@ def generate() -> None:
     person_rows_map: dict[int, tuple[object, ...]] = {}
     skipped_person_details = 0
     person_details_path = DATASETS_DIR / "person_details.csv"
-    person_details_total_rows = count_data_rows(person_details_path)
 
-    with person_details_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {
-            "person_mal_id",
-            "url",
-            "website_url",
-            "image_url",
-            "name",
-            "given_name",
-            "family_name",
-            "birthday",
-            "favorites",
-            "relevant_location",
-        }
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {
+        "person_mal_id",
+        "url",
+        "website_url",
+        "image_url",
+        "name",
+        "given_name",
+        "family_name",
+        "birthday",
+        "favorites",
+        "relevant_location",
+    }
+    with open_dataset(
+        person_details_path,
+        required_cols,
+        desc="Reading person details",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {person_details_path}")
 
-        for row in tqdm(
-            reader,
-            total=person_details_total_rows,
-            desc="Reading person details",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             person_id = parse_int(row.get("person_mal_id"))
             if person_id is None or person_id not in person_ids_needed:
                 continue
@@ -1076,20 +1308,17 @@ def generate() -> None:
 
     person_alternate_name_rows_set: set[tuple[int, str]] = set()
     person_alternate_name_path = DATASETS_DIR / "person_alternate_names.csv"
-    person_alternate_name_total_rows = count_data_rows(person_alternate_name_path)
-    with person_alternate_name_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required_cols = {"person_mal_id", "alt_name"}
-        if not required_cols.issubset(set(reader.fieldnames or [])):
+    required_cols = {"person_mal_id", "alt_name"}
+    with open_dataset(
+        person_alternate_name_path,
+        required_cols,
+        desc="Reading person alternate names",
+        show_progress=show_progress,
+    ) as reader:
+        if not required_cols.issubset(set(reader.fieldnames)):
             raise GeneratorError(f"Missing required columns in {person_alternate_name_path}")
 
-        for row in tqdm(
-            reader,
-            total=person_alternate_name_total_rows,
-            desc="Reading person alternate names",
-            unit="row",
-            disable=not show_progress,
-        ):
+        for row in reader:
             person_id = parse_int(row.get("person_mal_id"))
             alternate_name = normalize_text(row.get("alt_name"))
             if person_id is None or alternate_name is None:
@@ -1100,12 +1329,13 @@ def generate() -> None:
 
     person_alternate_name_rows = sorted(person_alternate_name_rows_set, key=lambda item: (item[0], item[1]))
 
-    app_user_rows = sample_app_users(
+    app_user_rows, sampled_user_ids = sample_app_users(
         n=n,
         random_seed=args.seed,
         gender_map=gender_map,
         country_map=country_map,
         show_progress=show_progress,
+        keep_ids=set((previous_manifest or {}).get("user_ids", [])),
     )
 
     person_anime_rows = sorted(
@@ -1132,217 +1362,163 @@ def generate() -> None:
         if skipped_missing_text:
             print(f"- missing required text columns: {skipped_missing_text}")
 
-    SEEDS_DIR.mkdir(parents=True, exist_ok=True)
-
     script_name = "dml/generate_main_seeds.py"
-    outputs = [
+    # number, table name, columns, rows, conflict target
+    seed_files = [
+        ("018", "character", CHARACTER_COLUMNS, character_rows, "id"),
+        ("019", "anime", ANIME_COLUMNS, anime_rows, "id"),
+        ("020", "person", PERSON_COLUMNS, person_rows, "id"),
+        ("021", "app_user", APP_USER_COLUMNS, app_user_rows, "id"),
         (
-            SEEDS_DIR / "018_character_seed.sql",
-            render_insert_sql(
-                table_name="character",
-                columns=CHARACTER_COLUMNS,
-                rows=character_rows,
-                conflict_clause="ON CONFLICT (id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(character_rows),
+            "022",
+            "character_nickname",
+            CHARACTER_NICKNAME_COLUMNS,
+            character_nickname_rows,
+            "character_id, nickname",
         ),
         (
-            SEEDS_DIR / "019_anime_seed.sql",
-            render_insert_sql(
-                table_name="anime",
-                columns=ANIME_COLUMNS,
-                rows=anime_rows,
-                conflict_clause="ON CONFLICT (id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_rows),
+            "023",
+            "person_alternate_name",
+            PERSON_ALTERNATE_NAME_COLUMNS,
+            person_alternate_name_rows,
+            "person_id, alternate_name",
         ),
+        ("024", "anime_genre", ANIME_GENRE_COLUMNS, anime_genre_rows, "anime_id, genre_id"),
         (
-            SEEDS_DIR / "020_person_seed.sql",
-            render_insert_sql(
-                table_name="person",
-                columns=PERSON_COLUMNS,
-                rows=person_rows,
-                conflict_clause="ON CONFLICT (id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(person_rows),
+            "025",
+            "anime_explicit_genre",
+            ANIME_EXPLICIT_GENRE_COLUMNS,
+            anime_explicit_genre_rows,
+            "anime_id, explicit_genre_id",
         ),
+        ("026", "anime_licensor", ANIME_LICENSOR_COLUMNS, anime_licensor_rows, "anime_id, licensor_id"),
         (
-            SEEDS_DIR / "021_app_user_seed.sql",
-            render_insert_sql(
-                table_name="app_user",
-                columns=APP_USER_COLUMNS,
-                rows=app_user_rows,
-                conflict_clause="ON CONFLICT (id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(app_user_rows),
+            "027",
+            "anime_demographic",
+            ANIME_DEMOGRAPHIC_COLUMNS,
+            anime_demographic_rows,
+            "anime_id, demographic_id",
         ),
+        ("028", "anime_producer", ANIME_PRODUCER_COLUMNS, anime_producer_rows, "anime_id, producer_id"),
         (
-            SEEDS_DIR / "022_character_nickname_seed.sql",
-            render_insert_sql(
-                table_name="character_nickname",
-                columns=CHARACTER_NICKNAME_COLUMNS,
-                rows=character_nickname_rows,
-                conflict_clause="ON CONFLICT (character_id, nickname) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(character_nickname_rows),
+            "029",
+            "anime_streaming_service",
+            ANIME_STREAMING_SERVICE_COLUMNS,
+            anime_streaming_service_rows,
+            "anime_id, streaming_service_id",
         ),
+        ("030", "anime_studio", ANIME_STUDIO_COLUMNS, anime_studio_rows, "anime_id, studio_id"),
+        ("031", "anime_theme", ANIME_THEME_COLUMNS, anime_theme_rows, "anime_id, theme_id"),
         (
-            SEEDS_DIR / "023_person_alternate_name_seed.sql",
-            render_insert_sql(
-                table_name="person_alternate_name",
-                columns=PERSON_ALTERNATE_NAME_COLUMNS,
-                rows=person_alternate_name_rows,
-                conflict_clause="ON CONFLICT (person_id, alternate_name) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(person_alternate_name_rows),
+            "032",
+            "character_anime_work",
+            CHARACTER_ANIME_WORK_COLUMNS,
+            character_anime_rows,
+            "anime_id, character_id",
         ),
+        ("033", "person_anime_work", PERSON_ANIME_WORK_COLUMNS, person_anime_rows, "anime_id, person_id"),
         (
-            SEEDS_DIR / "024_anime_genre_seed.sql",
-            render_insert_sql(
-                table_name="anime_genre",
-                columns=ANIME_GENRE_COLUMNS,
-                rows=anime_genre_rows,
-                conflict_clause="ON CONFLICT (anime_id, genre_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_genre_rows),
+            "034",
+            "person_voice_work",
+            PERSON_VOICE_WORK_COLUMNS,
+            person_voice_rows,
+            "person_id, anime_id, character_id, language_id",
         ),
         (
-            SEEDS_DIR / "025_anime_explicit_genre_seed.sql",
-            render_insert_sql(
-                table_name="anime_explicit_genre",
-                columns=ANIME_EXPLICIT_GENRE_COLUMNS,
-                rows=anime_explicit_genre_rows,
-                conflict_clause="ON CONFLICT (anime_id, explicit_genre_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_explicit_genre_rows),
-        ),
-        (
-            SEEDS_DIR / "026_anime_licensor_seed.sql",
-            render_insert_sql(
-                table_name="anime_licensor",
-                columns=ANIME_LICENSOR_COLUMNS,
-                rows=anime_licensor_rows,
-                conflict_clause="ON CONFLICT (anime_id, licensor_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_licensor_rows),
-        ),
-        (
-            SEEDS_DIR / "027_anime_demographic_seed.sql",
-            render_insert_sql(
-                table_name="anime_demographic",
-                columns=ANIME_DEMOGRAPHIC_COLUMNS,
-                rows=anime_demographic_rows,
-                conflict_clause="ON CONFLICT (anime_id, demographic_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_demographic_rows),
-        ),
-        (
-            SEEDS_DIR / "028_anime_producer_seed.sql",
-            render_insert_sql(
-                table_name="anime_producer",
-                columns=ANIME_PRODUCER_COLUMNS,
-                rows=anime_producer_rows,
-                conflict_clause="ON CONFLICT (anime_id, producer_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_producer_rows),
-        ),
-        (
-            SEEDS_DIR / "029_anime_streaming_service_seed.sql",
-            render_insert_sql(
-                table_name="anime_streaming_service",
-                columns=ANIME_STREAMING_SERVICE_COLUMNS,
-                rows=anime_streaming_service_rows,
-                conflict_clause="ON CONFLICT (anime_id, streaming_service_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_streaming_service_rows),
-        ),
-        (
-            SEEDS_DIR / "030_anime_studio_seed.sql",
-            render_insert_sql(
-                table_name="anime_studio",
-                columns=ANIME_STUDIO_COLUMNS,
-                rows=anime_studio_rows,
-                conflict_clause="ON CONFLICT (anime_id, studio_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_studio_rows),
-        ),
-        (
-            SEEDS_DIR / "031_anime_theme_seed.sql",
-            render_insert_sql(
-                table_name="anime_theme",
-                columns=ANIME_THEME_COLUMNS,
-                rows=anime_theme_rows,
-                conflict_clause="ON CONFLICT (anime_id, theme_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_theme_rows),
-        ),
-        (
-            SEEDS_DIR / "032_character_anime_work_seed.sql",
-            render_insert_sql(
-                table_name="character_anime_work",
-                columns=CHARACTER_ANIME_WORK_COLUMNS,
-                rows=character_anime_rows,
-                conflict_clause="ON CONFLICT (anime_id, character_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(character_anime_rows),
-        ),
-        (
-            SEEDS_DIR / "033_person_anime_work_seed.sql",
-            render_insert_sql(
-                table_name="person_anime_work",
-                columns=PERSON_ANIME_WORK_COLUMNS,
-                rows=person_anime_rows,
-                conflict_clause="ON CONFLICT (anime_id, person_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(person_anime_rows),
-        ),
-        (
-            SEEDS_DIR / "034_person_voice_work_seed.sql",
-            render_insert_sql(
-                table_name="person_voice_work",
-                columns=PERSON_VOICE_WORK_COLUMNS,
-                rows=person_voice_rows,
-                conflict_clause="ON CONFLICT (person_id, anime_id, character_id, language_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(person_voice_rows),
-        ),
-        (
-            SEEDS_DIR / "035_anime_recommendation_seed.sql",
-            render_insert_sql(
-                table_name="anime_recommendation",
-                columns=ANIME_RECOMMENDATION_COLUMNS,
-                rows=anime_recommendation_rows,
-                conflict_clause="ON CONFLICT (anime_id, recommended_anime_id) DO NOTHING;",
-                generated_by=script_name,
-            ),
-            len(anime_recommendation_rows),
+            "035",
+            "anime_recommendation",
+            ANIME_RECOMMENDATION_COLUMNS,
+            anime_recommendation_rows,
+            "anime_id, recommended_anime_id",
         ),
     ]
 
-    for out_path, sql_content, row_count in tqdm(
-        outputs,
-        desc="Writing seed SQL files",
+    update_columns: dict[str, list[str]] = {}
+    manifest_tables: dict[str, dict[str, str]] = {}
+    if args.incremental:
+        delta_files = []
+        for number, table_name, columns, rows, conflict_columns in seed_files:
+            key_columns = [name.strip() for name in conflict_columns.split(",")]
+            previous_hashes = previous_tables.get(table_name, {})
+            delta, hashes, new_rows, changed_rows = diff_rows(
+                rows,
+                [columns.index(name) for name in key_columns],
+                previous_hashes,
+            )
+            manifest_tables[table_name] = hashes
+            update_columns[table_name] = [column for column in columns if column not in key_columns]
+            delta_files.append((number, table_name, columns, delta, conflict_columns))
+
+            summary = f"{table_name}: {new_rows} new, {changed_rows} changed, {len(hashes) - len(delta)} unchanged"
+            removed = sum(1 for key in previous_hashes if key not in hashes)
+            if removed:
+                summary += f", {removed} no longer generated (left in the database)"
+            print(summary)
+        seed_files = delta_files
+
+    SEEDS_DIR.mkdir(parents=True, exist_ok=True)
+    if args.direct_load:
+        load_seed_tables(connection_string, seed_files, show_progress, update_columns)
+    else:
+        write_seed_files(seed_files, args, script_name, update_columns, show_progress)
+
+    if args.incremental:
+        # Seed files are loaded later by run-sql.py: until then the manifest is
+        # only pending, so a failed load is regenerated by the next delta.
+        manifest_path = MANIFEST_PATH if args.direct_load else PENDING_MANIFEST_PATH
+        write_manifest(
+            manifest_path,
+            {
+                "version": MANIFEST_VERSION,
+                "anime_ids": sorted(selected_anime_ids),
+                "user_ids": sampled_user_ids,
+                "tables": manifest_tables,
+            },
+        )
+        if args.direct_load:
+            PENDING_MANIFEST_PATH.unlink(missing_ok=True)
+            print(f"Wrote {MANIFEST_PATH.relative_to(ROOT)}")
+        else:
+            print(
+                f"Wrote {PENDING_MANIFEST_PATH.relative_to(ROOT)}; after loading the seed files run "
+                "generate_main_seeds.py --promote-manifest"
+            )
+
+
+def write_seed_files(
+    seed_files: list[tuple[str, str, list[str], list[tuple[object, ...]], str]],
+    args: argparse.Namespace,
+    script_name: str,
+    update_columns: dict[str, list[str]],
+    show_progress: bool,
+) -> None:
+    for number, table_name, columns, rows, conflict_columns in tqdm(
+        seed_files,
+        desc="Writing seed files",
         unit="file",
         disable=not show_progress,
     ):
-        out_path.write_text(sql_content, encoding="utf-8")
+        out_path = SEEDS_DIR / f"{number}_{table_name}_seed.{args.format}"
+        if args.format == "copy":
+            row_count = write_copy_data(
+                out_path,
+                table_name=table_name,
+                columns=columns,
+                rows=rows,
+                conflict_columns=conflict_columns,
+                generated_by=script_name,
+                update_columns=update_columns.get(table_name),
+            )
+        else:
+            row_count = write_insert_sql(
+                out_path,
+                table_name=table_name,
+                columns=columns,
+                rows=rows,
+                on_conflict=conflict_clause(conflict_columns, update_columns.get(table_name)),
+                generated_by=script_name,
+                rows_per_insert=args.rows_per_insert,
+            )
         print(f"Wrote {out_path.relative_to(ROOT)} ({row_count} rows)")
 
 
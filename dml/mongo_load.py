@@ -0,0 +1,314 @@
+"""Batched MongoDB writes shared by generate_document_seeds.py and run-nosql.py.
+
+MongoBatchWriter groups documents into insert_many batches and hands them to
+a background thread through a bounded queue. The producer (building the
+documents) runs while earlier batches are on the network, and at most
+queue_batches batches wait in memory, so a fast producer is throttled rather
+than buffering the whole collection.
+
+write_parallel() is the file loader's counterpart: it spreads the batches of
+several collections over a pool of worker threads sharing one MongoClient
+connection pool, so round trips overlap instead of running one at a time.
+Batches are either inserted or upserted by id (ReplaceOne with upsert=True).
+
+INDEX_SPECS declares the indexes of both collections; create_indexes() builds
+them after a load, and apply_validator() attaches a $jsonSchema validator
+derived from schema/*.json.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+from tqdm import tqdm
+
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_BATCHES = 4
+SCHEMA_DIR = Path(__file__).resolve().parents[1] / "schema"
+
+INDEX_SPECS: dict[str, list[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)]),
+    ],
+    "ratings": [
+        IndexModel([("id", ASCENDING)]),
+        # Not unique: ratings.csv repeats some (username, anime_id) pairs.
+        # Also serves lookups by user_id alone.
+        IndexModel([("user_id", ASCENDING), ("anime_id", ASCENDING)]),
+        # Per-anime score aggregates; also serves lookups by anime_id alone.
+        IndexModel([("anime_id", ASCENDING), ("score", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+    ],
+}
+
+VALIDATOR_SCHEMAS = {
+    "users": "user_document.json",
+    "ratings": "rating_document.json",
+}
+# users schema per generate_document_seeds.py --user-layout.
+USER_LAYOUT_SCHEMAS = {
+    "reference": "user_document.json",
+    "embedded": "user_document_embedded.json",
+}
+
+
+def chunked(items: Iterable[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def describe_bulk_write_error(exc: BulkWriteError) -> str:
+    write_errors = exc.details.get("writeErrors", [])
+    if not write_errors:
+        return str(exc)
+    first = write_errors[0]
+    return f"{len(write_errors)} write errors, first: {first.get('errmsg', first)}"
+
+
+class MongoBatchWriter:
+    """Insert documents into a collection in batches from a background thread.
+
+    Use as a context manager. An insert error stops the writer: later write()
+    calls and close() re-raise it, and batches still queued are dropped.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_batches: int = DEFAULT_QUEUE_BATCHES,
+    ) -> None:
+        self.collection = collection
+        self.batch_size = batch_size
+        self.inserted = 0
+        self._batch: list[dict[str, Any]] = []
+        self._queue: queue.Queue[list[dict[str, Any]] | None] = queue.Queue(maxsize=queue_batches)
+        self._error: Exception | None = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"mongo-insert-{collection.name}",
+            daemon=True,
+        )
+
+    def __enter__(self) -> MongoBatchWriter:
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._batch = []
+            self._finish()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue  # keep draining so the producer never blocks on a full queue
+            try:
+                result = self.collection.insert_many(batch, ordered=False)
+                self.inserted += len(result.inserted_ids)
+            except BulkWriteError as exc:
+                self.inserted += exc.details.get("nInserted", 0)
+                self._error = exc
+            except Exception as exc:
+                self._error = exc
+
+    def _put(self, batch: list[dict[str, Any]]) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(batch)
+
+    def _finish(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def write(self, document: dict[str, Any]) -> None:
+        self._batch.append(document)
+        if len(self._batch) >= self.batch_size:
+            self._put(self._batch)
+            self._batch = []
+
+    def write_many(self, documents: Iterable[dict[str, Any]]) -> None:
+        for document in documents:
+            self.write(document)
+
+    def close(self) -> int:
+        """Flush the last batch, wait for every insert and return the inserted count."""
+        try:
+            if self._batch:
+                self._put(self._batch)
+        finally:
+            self._batch = []
+            self._finish()
+        if self._error is not None:
+            raise self._error
+        return self.inserted
+
+
+def write_batch(collection: Collection, batch: list[dict[str, Any]], upsert: bool) -> dict[str, int]:
+    """Insert a batch, or replace each document by id inserting the missing ones."""
+    if not upsert:
+        return {"inserted": len(collection.insert_many(batch, ordered=False).inserted_ids)}
+    result = collection.bulk_write(
+        [ReplaceOne({"id": document["id"]}, document, upsert=True) for document in batch],
+        ordered=False,
+    )
+    return {
+        "inserted": result.upserted_count,
+        "replaced": result.modified_count,
+        "unchanged": result.matched_count - result.modified_count,
+    }
+
+
+def write_parallel(
+    targets: list[tuple[str, Collection, Iterable[dict[str, Any]]]],
+    batch_size: int,
+    workers: int,
+    show_progress: bool,
+    upsert: bool = False,
+) -> tuple[dict[str, dict[str, int]], list[str]]:
+    """Write each (label, collection, documents) target with up to workers concurrent batches.
+
+    Targets are fed round-robin, so all collections load at the same time, and
+    at most 2 * workers batches are in flight. Batches are independent
+    (ordered=False): a failed batch is reported as soon as it completes and
+    the others still run. With upsert, documents replace the one with the
+    same id; MongoDB leaves identical documents untouched. Returns the
+    inserted, replaced and unchanged counts per label and the failure messages.
+    """
+    counts = {label: {"inserted": 0, "replaced": 0, "unchanged": 0} for label, _, _ in targets}
+    failures: list[str] = []
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(2 * workers)
+    bars = {
+        label: tqdm(
+            desc=f"{'Upserting' if upsert else 'Inserting'} {label}",
+            unit="doc",
+            unit_scale=True,
+            disable=not show_progress,
+        )
+        for label, _, _ in targets
+    }
+
+    def write(label: str, collection: Collection, number: int, batch: list[dict[str, Any]]) -> None:
+        try:
+            error = None
+            try:
+                batch_counts = write_batch(collection, batch, upsert)
+            except BulkWriteError as exc:
+                details = exc.details
+                batch_counts = {
+                    "inserted": details.get("nInserted", 0) + details.get("nUpserted", 0),
+                    "replaced": details.get("nModified", 0),
+                    "unchanged": details.get("nMatched", 0) - details.get("nModified", 0),
+                }
+                error = describe_bulk_write_error(exc)
+            except Exception as exc:
+                # Anything else (InvalidDocument, a document without id...) fails
+                # just this batch; the executor would otherwise drop it silently.
+                batch_counts = {}
+                error = f"{type(exc).__name__}: {exc}"
+            with lock:
+                for key, value in batch_counts.items():
+                    counts[label][key] += value
+                bars[label].update(len(batch))
+                if error is not None:
+                    failures.append(f"{label} batch {number}: {error}")
+                    tqdm.write(f"Error: {label} batch {number}: {error}", file=sys.stderr)
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mongo-write") as executor:
+            feeds = [
+                (label, collection, enumerate(chunked(documents, batch_size), start=1))
+                for label, collection, documents in targets
+            ]
+            while feeds:
+                for feed in list(feeds):
+                    label, collection, batches = feed
+                    next_batch = next(batches, None)
+                    if next_batch is None:
+                        feeds.remove(feed)
+                        continue
+                    slots.acquire()
+                    executor.submit(write, label, collection, *next_batch)
+    finally:
+        for bar in bars.values():
+            bar.close()
+    return counts, failures
+
+
+def create_indexes(collection: Collection) -> float:
+    """Build every index of INDEX_SPECS for the collection in one createIndexes command.
+
+    Run after the bulk insert: building all indexes together costs a single
+    collection scan, instead of maintaining them on every insert. Returns the
+    elapsed seconds.
+    """
+    specs = INDEX_SPECS[collection.name]
+    started = time.perf_counter()
+    names = collection.create_indexes(specs)
+    elapsed = time.perf_counter() - started
+    print(f"Created {len(names)} indexes on {collection.name} ({', '.join(names)}) in {elapsed:.2f}s")
+    return elapsed
+
+
+def mongo_json_schema(schema: dict[str, Any], top_level: bool = True) -> dict[str, Any]:
+    """Translate a draft-07 JSON Schema from schema/ into MongoDB's $jsonSchema dialect.
+
+    $jsonSchema has no "integer" type and rejects "$schema", so integers become
+    bsonType int/long. The top-level object also allows the _id MongoDB adds.
+    """
+    translated: dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == "$schema":
+            continue
+        if key == "type" and value == "integer":
+            translated["bsonType"] = ["int", "long"]
+        elif key == "properties":
+            translated[key] = {name: mongo_json_schema(child, False) for name, child in value.items()}
+        elif key in ("items", "additionalProperties") and isinstance(value, dict):
+            translated[key] = mongo_json_schema(value, False)
+        else:
+            translated[key] = value
+    if top_level and translated.get("additionalProperties") is False:
+        translated.setdefault("properties", {})["_id"] = {}
+    return translated
+
+
+def apply_validator(db: Database, name: str, action: str, schema_file: str | None = None) -> None:
+    """Attach the $jsonSchema of schema/<document>.json to the collection.
+
+    action is MongoDB's validationAction: "error" rejects invalid documents,
+    "warn" only logs them. schema_file defaults to VALIDATOR_SCHEMAS[name].
+    """
+    schema_path = SCHEMA_DIR / (schema_file or VALIDATOR_SCHEMAS[name])
+    validator = {"$jsonSchema": mongo_json_schema(json.loads(schema_path.read_text(encoding="utf-8")))}
+    options = {"validator": validator, "validationLevel": "strict", "validationAction": action}
+    if name in db.list_collection_names(filter={"name": name}):
+        db.command("collMod", name, **options)
+    else:
+        db.create_collection(name, **options)
+    print(f"Applied {schema_path.relative_to(SCHEMA_DIR.parent).as_posix()} validator to {name} ({action})")
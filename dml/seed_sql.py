@@ -0,0 +1,139 @@
+"""Streaming writers for the dml/seeds/* files.
+
+Rows are rendered one at a time and written through a buffered file handle,
+so no seed file is ever held in memory as a single string.
+
+write_insert_sql() writes NNN_<table>_seed.sql files of INSERT ... ON CONFLICT
+DO NOTHING statements; long tables are split every rows_per_insert rows (0
+keeps every row in one statement).
+
+write_copy_data() writes NNN_<table>_seed.copy files: the same comment
+header, an "-- On conflict:" line naming the conflict target (plus an
+"-- On conflict update:" line listing the columns to overwrite, for delta
+seeds), then a
+"COPY <table> (<columns>) FROM stdin;" block of PostgreSQL text-format rows
+terminated by "\\.". run-sql.py --format copy streams that block into a
+staging table and inserts it with the conflict target, so loading stays
+idempotent.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+
+
+DEFAULT_ROWS_PER_INSERT = 1000
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def sql_escape(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def sql_literal(value: object) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return f"'{sql_escape(value)}'"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def copy_text(value: object) -> str:
+    """Render value as a field of PostgreSQL's COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = str(value)
+    if isinstance(value, str):
+        text = (
+            text.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    return text
+
+
+def conflict_clause(conflict_columns: str, update_columns: list[str] | None = None) -> str:
+    """ON CONFLICT clause that skips existing keys, or overwrites update_columns."""
+    if not update_columns:
+        return f"ON CONFLICT ({conflict_columns}) DO NOTHING;"
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    return f"ON CONFLICT ({conflict_columns}) DO UPDATE SET {assignments};"
+
+
+def write_insert_sql(
+    out_path: Path,
+    table_name: str,
+    columns: list[str],
+    rows: Iterable[tuple[object, ...]],
+    on_conflict: str,
+    generated_by: str,
+    empty_comment: str | None = None,
+    rows_per_insert: int = DEFAULT_ROWS_PER_INSERT,
+) -> int:
+    """Write rows to out_path as INSERT statements and return the row count."""
+    insert_line = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES\n"
+    row_count = 0
+    with out_path.open("w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_BYTES) as handle:
+        handle.write(f"-- Seed data for table: {table_name}\n")
+        handle.write(f"-- Generated by {generated_by}\n")
+        handle.write("\n")
+
+        in_statement = 0
+        for row in rows:
+            if in_statement == 0:
+                if row_count:
+                    handle.write("\n")
+                handle.write(insert_line)
+            else:
+                handle.write(",\n")
+            handle.write("    (" + ", ".join(sql_literal(value) for value in row) + ")")
+            row_count += 1
+            in_statement += 1
+            if in_statement == rows_per_insert:
+                handle.write(f"\n{on_conflict}\n")
+                in_statement = 0
+
+        if in_statement:
+            handle.write(f"\n{on_conflict}\n")
+        if not row_count:
+            handle.write((empty_comment or f"-- No rows generated for {table_name}.") + "\n")
+    return row_count
+
+
+def write_copy_data(
+    out_path: Path,
+    table_name: str,
+    columns: list[str],
+    rows: Iterable[tuple[object, ...]],
+    conflict_columns: str,
+    generated_by: str,
+    empty_comment: str | None = None,
+    update_columns: list[str] | None = None,
+) -> int:
+    """Write rows to out_path as a COPY FROM stdin block and return the row count."""
+    row_count = 0
+    with out_path.open("w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_BYTES) as handle:
+        handle.write(f"-- Seed data for table: {table_name}\n")
+        handle.write(f"-- Generated by {generated_by}\n")
+        handle.write(f"-- On conflict: {conflict_columns}\n")
+        if update_columns:
+            handle.write(f"-- On conflict update: {', '.join(update_columns)}\n")
+        handle.write("\n")
+
+        for row in rows:
+            if not row_count:
+                handle.write(f"COPY {table_name} ({', '.join(columns)}) FROM stdin;\n")
+            handle.write("\t".join(copy_text(value) for value in row) + "\n")
+            row_count += 1
+
+        if row_count:
+            handle.write("\\.\n")
+        else:
+            handle.write((empty_comment or f"-- No rows generated for {table_name}.") + "\n")
+    return row_count
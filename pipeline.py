@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import json
 import re
 import subprocess
 import sys
@@ -18,7 +19,7 @@ def parse_args() -> argparse.Namespace:
         description=(
             "Run the full pipeline from datasets to both databases: "
             "generate distinct CSVs, generate lookup seeds, create SQL schema, generate SQL DML, load PostgreSQL, "
-            "generate NoSQL JSON docs, load MongoDB."
+            "create SQL indexes, generate NoSQL JSON docs, load MongoDB."
         )
     )
     parser.add_argument(
@@ -56,11 +57,83 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Clear Mongo users/ratings collections before insert.",
     )
+    parser.add_argument(
+        "--nosql-upsert",
+        action="store_true",
+        help=(
+            "Upsert Mongo documents by id with run-nosql.py --upsert instead of inserting them; "
+            "ratings get per-user ids (not with --nosql-clear or --nosql-direct)."
+        ),
+    )
     parser.add_argument(
         "--nosql-batch-size",
         type=int,
         default=1000,
-        help="Mongo insert batch size for run-nosql.py (default: 1000).",
+        help="Mongo insert batch size for run-nosql.py or --nosql-direct (default: 1000).",
+    )
+    parser.add_argument(
+        "--nosql-workers",
+        type=int,
+        default=1,
+        help="Concurrent insert batches for run-nosql.py --workers (default: 1).",
+    )
+    parser.add_argument(
+        "--nosql-shards",
+        type=int,
+        default=1,
+        help=(
+            "Generate the NoSQL documents in this many shards from parallel processes "
+            "(generate_document_seeds.py --shards), loaded in parallel by run-nosql.py "
+            "(not with --nosql-direct, default: 1)."
+        ),
+    )
+    parser.add_argument(
+        "--nosql-user-layout",
+        choices=("reference", "embedded"),
+        default="reference",
+        help=(
+            "Layout of the Mongo users documents (generate_document_seeds.py --user-layout): rating ids "
+            "or an embedded rating summary (default: reference)."
+        ),
+    )
+    parser.add_argument(
+        "--nosql-direct",
+        action="store_true",
+        help=(
+            "Insert the NoSQL documents into MongoDB while generating them "
+            "(generate_document_seeds.py --output-format mongo) instead of writing JSON for run-nosql.py."
+        ),
+    )
+    parser.add_argument(
+        "--dml-engine",
+        choices=("python", "pandas"),
+        default="python",
+        help="Engine used by generate_main_seeds.py for the anime details/stats join (default: python).",
+    )
+    parser.add_argument(
+        "--dml-incremental",
+        action="store_true",
+        help=(
+            "Generate only new or changed SQL seed rows since the previous run "
+            "(generate_main_seeds.py --incremental)."
+        ),
+    )
+    parser.add_argument(
+        "--dml-format",
+        choices=("sql", "copy"),
+        default="sql",
+        help="Seed file format for the SQL seed generators and run-sql.py (default: sql).",
+    )
+    parser.add_argument(
+        "--sql-jobs",
+        type=int,
+        default=1,
+        help="Connections run-sql.py may use to run independent DDL/seed files in parallel (default: 1).",
+    )
+    parser.add_argument(
+        "--sql-bulk-load",
+        action="store_true",
+        help="Load the SQL seeds with run-sql.py --bulk-load (keys rebuilt after the load, then ANALYZE).",
     )
     parser.add_argument(
         "--progress",
@@ -103,13 +176,28 @@ def parse_user_ids_from_app_user_seed(seed_path: Path) -> list[int]:
         raise SystemExit(f"Expected seed file not found: {seed_path}")
 
     content = seed_path.read_text(encoding="utf-8")
-    ids = [int(match.group(1)) for match in re.finditer(r"\(\s*(\d+)\s*,", content)]
+    if seed_path.suffix == ".copy":
+        ids = [int(match.group(1)) for match in re.finditer(r"^(\d+)\t", content, re.MULTILINE)]
+    else:
+        ids = [int(match.group(1)) for match in re.finditer(r"\(\s*(\d+)\s*,", content)]
     unique_ids = sorted(set(ids))
     if not unique_ids:
         raise SystemExit(f"No app_user IDs found in seed file: {seed_path}")
     return unique_ids
 
 
+def parse_user_ids_from_manifest(manifest_path: Path) -> list[int]:
+    """All app_user IDs of an incremental run, not just the delta in the seed file."""
+    if not manifest_path.exists():
+        raise SystemExit(f"Expected run manifest not found: {manifest_path}")
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    unique_ids = sorted({json.loads(key)[0] for key in manifest.get("tables", {}).get("app_user", {})})
+    if not unique_ids:
+        raise SystemExit(f"No app_user IDs found in run manifest: {manifest_path}")
+    return unique_ids
+
+
 def write_user_ids_file(user_ids_csv: str) -> Path:
     output_dir = ROOT / "dml" / "document-seeds"
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -123,16 +211,38 @@ def main() -> None:
 
     if args.n <= 0:
         raise SystemExit("--n must be greater than 0")
-
-    total_steps = 7
+    if args.nosql_upsert and (args.nosql_clear or args.nosql_direct):
+        raise SystemExit("--nosql-upsert cannot be combined with --nosql-clear or --nosql-direct")
+    if args.nosql_shards < 1:
+        raise SystemExit("--nosql-shards must be at least 1")
+    if args.nosql_shards > 1 and args.nosql_direct:
+        raise SystemExit("--nosql-shards cannot be combined with --nosql-direct")
+
+    total_steps = 7 if args.nosql_direct else 8
     python = sys.executable
     child_progress = "off" if args.progress == "linear" else args.progress
 
     distinct_cmd = [python, "data-import/generate_distinct_csvs.py", "--progress", child_progress]
 
-    lookup_cmd = [python, "dml/generate_lookup_seeds.py", "--progress", child_progress]
+    lookup_cmd = [
+        python,
+        "dml/generate_lookup_seeds.py",
+        "--format",
+        args.dml_format,
+        "--progress",
+        child_progress,
+    ]
 
-    ddl_cmd = [python, "run-sql.py", "--scripts-dir", "ddl/tables", "--progress", child_progress]
+    ddl_cmd = [
+        python,
+        "run-sql.py",
+        "--scripts-dir",
+        "ddl/tables",
+        "--jobs",
+        str(max(1, args.sql_jobs)),
+        "--progress",
+        child_progress,
+    ]
     if args.sql_connection_string:
         ddl_cmd.insert(2, args.sql_connection_string)
 
@@ -141,16 +251,39 @@ def main() -> None:
         "dml/generate_main_seeds.py",
         "--n",
         str(args.n),
+        "--engine",
+        args.dml_engine,
+        "--format",
+        args.dml_format,
         "--progress",
         child_progress,
     ]
     if args.seed is not None:
         dml_generate_cmd.extend(["--seed", str(args.seed)])
+    if args.dml_incremental:
+        dml_generate_cmd.append("--incremental")
 
-    dml_load_cmd = [python, "run-sql.py", "--scripts-dir", "dml/seeds", "--progress", child_progress]
+    dml_load_cmd = [
+        python,
+        "run-sql.py",
+        "--scripts-dir",
+        "dml/seeds",
+        "--format",
+        args.dml_format,
+        "--jobs",
+        str(max(1, args.sql_jobs)),
+        "--progress",
+        child_progress,
+    ]
+    if args.sql_bulk_load:
+        dml_load_cmd.append("--bulk-load")
     if args.sql_connection_string:
         dml_load_cmd.insert(2, args.sql_connection_string)
 
+    index_cmd = [python, "run-sql.py", "--scripts-dir", "ddl/indexes", "--progress", child_progress]
+    if args.sql_connection_string:
+        index_cmd.insert(2, args.sql_connection_string)
+
     nosql_load_cmd = [
         python,
         "run-nosql.py",
@@ -158,30 +291,46 @@ def main() -> None:
         "dml/document-seeds",
         "--batch-size",
         str(max(1, args.nosql_batch_size)),
+        "--workers",
+        str(max(1, args.nosql_workers)),
         "--progress",
         child_progress,
     ]
     if args.nosql_clear:
         nosql_load_cmd.append("--clear")
+    if args.nosql_upsert:
+        nosql_load_cmd.append("--upsert")
     if args.nosql_connection_string:
         nosql_load_cmd.insert(2, args.nosql_connection_string)
 
     progress_bar: tqdm | None = None
     if should_enable_tqdm(args.progress):
-        progress_bar = tqdm(total=total_steps, desc="[0/7] Starting pipeline", unit="step")
+        progress_bar = tqdm(total=total_steps, desc=f"[0/{total_steps}] Starting pipeline", unit="step")
 
     run_step(1, total_steps, "Generate distinct CSV files from datasets", distinct_cmd, progress_bar)
     run_step(2, total_steps, "Generate SQL lookup seed files", lookup_cmd, progress_bar)
     run_step(3, total_steps, "Create/ensure SQL schema (DDL)", ddl_cmd, progress_bar)
     run_step(4, total_steps, "Generate SQL main seed files from datasets", dml_generate_cmd, progress_bar)
     run_step(5, total_steps, "Load SQL seed files into PostgreSQL", dml_load_cmd, progress_bar)
+    if args.dml_incremental:
+        promote_cmd = [python, "dml/generate_main_seeds.py", "--promote-manifest"]
+        print("$ " + " ".join(promote_cmd))
+        try:
+            subprocess.run(promote_cmd, cwd=ROOT, check=True)
+        except subprocess.CalledProcessError as exc:
+            raise SystemExit(f"Pipeline failed promoting the incremental manifest (exit code {exc.returncode})") from exc
+    run_step(6, total_steps, "Create SQL secondary indexes", index_cmd, progress_bar)
 
     if args.user_ids:
         user_ids_csv = args.user_ids
         print(f"Using user IDs from argument: {user_ids_csv}")
     else:
-        app_user_seed_path = ROOT / "dml" / "seeds" / "021_app_user_seed.sql"
-        derived_user_ids = parse_user_ids_from_app_user_seed(app_user_seed_path)
+        if args.dml_incremental:
+            app_user_seed_path = ROOT / "dml" / "seeds" / "main_seeds_manifest.json"
+            derived_user_ids = parse_user_ids_from_manifest(app_user_seed_path)
+        else:
+            app_user_seed_path = ROOT / "dml" / "seeds" / f"021_app_user_seed.{args.dml_format}"
+            derived_user_ids = parse_user_ids_from_app_user_seed(app_user_seed_path)
         user_ids_csv = ",".join(str(uid) for uid in derived_user_ids)
         print(f"Derived {len(derived_user_ids)} user IDs from {app_user_seed_path.relative_to(ROOT)}")
 
@@ -198,9 +347,26 @@ def main() -> None:
     ]
     if args.sql_connection_string:
         doc_generate_cmd.extend(["--sql-connection-string", args.sql_connection_string])
-
-    run_step(6, total_steps, "Generate NoSQL JSON document seeds", doc_generate_cmd, progress_bar)
-    run_step(7, total_steps, "Load NoSQL JSON seeds into MongoDB", nosql_load_cmd, progress_bar)
+    if args.nosql_shards > 1:
+        doc_generate_cmd.extend(["--shards", str(args.nosql_shards)])
+    if args.nosql_upsert:
+        # Sequential ids shift whenever the user set changes; upserts need stable ones.
+        doc_generate_cmd.extend(["--rating-ids", "per-user"])
+    if args.nosql_user_layout != "reference":
+        doc_generate_cmd.extend(["--user-layout", args.nosql_user_layout])
+
+    if args.nosql_direct:
+        doc_generate_cmd.extend(
+            ["--output-format", "mongo", "--batch-size", str(max(1, args.nosql_batch_size))]
+        )
+        if args.nosql_clear:
+            doc_generate_cmd.append("--clear")
+        if args.nosql_connection_string:
+            doc_generate_cmd.extend(["--nosql-connection-string", args.nosql_connection_string])
+        run_step(7, total_steps, "Generate NoSQL documents straight into MongoDB", doc_generate_cmd, progress_bar)
+    else:
+        run_step(7, total_steps, "Generate NoSQL JSON document seeds", doc_generate_cmd, progress_bar)
+        run_step(8, total_steps, "Load NoSQL JSON seeds into MongoDB", nosql_load_cmd, progress_bar)
 
     if progress_bar is not None:
         progress_bar.close()
@@ -2,20 +2,26 @@
 from __future__ import annotations
 
 import argparse
+import gzip
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, TextIO
 
 from pymongo import MongoClient
-from pymongo.errors import BulkWriteError, ConnectionFailure
+from pymongo.database import Database
+from pymongo.errors import ConnectionFailure
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "dml"))
+from mongo_load import USER_LAYOUT_SCHEMAS, apply_validator, create_indexes, write_parallel  # noqa: E402
+
+
+# pymongo's default maxPoolSize; raised to --workers when more writers are asked for.
+DEFAULT_POOL_SIZE = 100
 
-def chunked(items: list[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
-    for idx in range(0, len(items), batch_size):
-        yield items[idx : idx + batch_size]
 
 def load_env_variables() -> None:
     env_path = Path(__file__).resolve().parent / ".env.local"
@@ -43,10 +49,17 @@ def resolve_database_name() -> str:
         return database_name
     raise ValueError("Missing database name. Set MONGO_DB environment variable.")
 
+def open_input(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
 def load_json_array(path: Path, label: str) -> list[dict[str, Any]]:
     if not path.exists():
         raise FileNotFoundError(f"{label} file not found: {path}")
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    with open_input(path) as handle:
+        payload = json.load(handle)
     if not isinstance(payload, list):
         raise ValueError(f"{label} file must contain a JSON array: {path}")
     if not all(isinstance(item, dict) for item in payload):
@@ -54,77 +67,238 @@ def load_json_array(path: Path, label: str) -> list[dict[str, Any]]:
     return payload
 
 
+def iter_ndjson(path: Path, label: str) -> Iterator[dict[str, Any]]:
+    with open_input(path) as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            document = json.loads(line)
+            if not isinstance(document, dict):
+                raise ValueError(f"{label} file line {line_number} must be a JSON object: {path}")
+            yield document
+
+
+def load_documents(path: Path, label: str) -> Iterable[dict[str, Any]]:
+    """Load a .json array file, or stream a .ndjson file line by line (either optionally .gz)."""
+    if not path.exists():
+        raise FileNotFoundError(f"{label} file not found: {path}")
+    if path.name.removesuffix(".gz").endswith(".ndjson"):
+        return iter_ndjson(path, label)
+    return load_json_array(path, label)
+
+
+def resolve_input_files(input_dir: Path) -> list[tuple[Path, Path]]:
+    """Return the (users, ratings) files named by input_dir/manifest.json, one pair per shard.
+
+    Without a manifest the .json defaults are returned as a single pair.
+    """
+    manifest_path = input_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        entries = manifest.get("shards") or [manifest]
+        if all(entry.get("users_file") and entry.get("ratings_file") for entry in entries):
+            # The manifest stores paths as seen from where the generator ran.
+            return [
+                (input_dir / Path(entry["users_file"]).name, input_dir / Path(entry["ratings_file"]).name)
+                for entry in entries
+            ]
+    return [(input_dir / "users.json", input_dir / "ratings.json")]
+
+
+def resolve_user_layout(input_dir: Path) -> str:
+    """Return the users layout recorded in input_dir/manifest.json ("reference" if absent)."""
+    manifest_path = input_dir / "manifest.json"
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text(encoding="utf-8")).get("user_layout", "reference")
+    return "reference"
+
+
+def resolve_rating_ids(input_dir: Path) -> str | None:
+    """Return how the rating ids in input_dir were numbered, or None without a manifest.
+
+    Manifests older than --rating-ids hold sequential ids.
+    """
+    manifest_path = input_dir / "manifest.json"
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text(encoding="utf-8")).get("rating_ids", "sequential")
+    return None
+
+
+def connect(connection_string: str, workers: int) -> MongoClient:
+    client = MongoClient(
+        connection_string,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=max(DEFAULT_POOL_SIZE, workers),
+    )
+    client.admin.command("ping")
+    return client
+
+
+def prepare_collections(
+    db: Database,
+    clear_collections: bool,
+    upsert: bool,
+    validation: str,
+    user_layout: str,
+) -> None:
+    users_collection = db["users"]
+    ratings_collection = db["ratings"]
+
+    if clear_collections:
+        users_collection.delete_many({})
+        ratings_collection.delete_many({})
+        print("Cleared existing documents from users and ratings collections.")
+
+    if validation != "off":
+        apply_validator(db, "users", validation, USER_LAYOUT_SCHEMAS[user_layout])
+        apply_validator(db, "ratings", validation)
+
+    if upsert:
+        # Every upsert looks its document up by id, so build the indexes first.
+        create_indexes(users_collection)
+        create_indexes(ratings_collection)
+
+
+def report_counts(db: Database, counts: dict[str, dict[str, int]], upsert: bool) -> None:
+    """Print the written counts and, after a plain insert, build the indexes."""
+    for label, noun in (("users", "user"), ("ratings", "rating")):
+        label_counts = counts[label]
+        if upsert:
+            print(
+                f"Upserted {noun} documents into {db.name}.{label}: "
+                f"{label_counts['inserted']} new, {label_counts['replaced']} replaced, "
+                f"{label_counts['unchanged']} unchanged"
+            )
+        elif label_counts["inserted"]:
+            print(f"Inserted {label_counts['inserted']} {noun} documents into {db.name}.{label}")
+            create_indexes(db[label])
+        else:
+            print(f"No {noun} documents to insert.")
+
+
 def insert_documents(
     connection_string: str,
     database_name: str,
-    users: list[dict[str, Any]],
-    ratings: list[dict[str, Any]],
+    users: Iterable[dict[str, Any]],
+    ratings: Iterable[dict[str, Any]],
     clear_collections: bool,
+    upsert: bool,
     batch_size: int,
+    workers: int,
+    validation: str,
+    user_layout: str,
     show_progress: bool,
 ) -> None:
     try:
-        client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
-        client.admin.command("ping")
-
+        client = connect(connection_string, workers)
         db = client[database_name]
-        users_collection = db["users"]
-        ratings_collection = db["ratings"]
-
-        if clear_collections:
-            users_collection.delete_many({})
-            ratings_collection.delete_many({})
-            print("Cleared existing documents from users and ratings collections.")
-
-        if users:
-            inserted_users = 0
-            for batch in tqdm(
-                chunked(users, batch_size),
-                desc="Inserting users",
-                unit="batch",
-                disable=not show_progress,
-            ):
-                user_result = users_collection.insert_many(batch, ordered=False)
-                inserted_users += len(user_result.inserted_ids)
-            print(f"Inserted {inserted_users} user documents into {database_name}.users")
+        prepare_collections(db, clear_collections, upsert, validation, user_layout)
+
+        counts, failures = write_parallel(
+            [("users", db["users"], users), ("ratings", db["ratings"], ratings)],
+            batch_size=batch_size,
+            workers=workers,
+            show_progress=show_progress,
+            upsert=upsert,
+        )
 
-            users_collection.create_index("id")
-            print("Created index on users.id")
-        else:
-            print("No user documents to insert.")
-
-        if ratings:
-            inserted_ratings = 0
-            for batch in tqdm(
-                chunked(ratings, batch_size),
-                desc="Inserting ratings",
-                unit="batch",
-                disable=not show_progress,
-            ):
-                rating_result = ratings_collection.insert_many(batch, ordered=False)
-                inserted_ratings += len(rating_result.inserted_ids)
-            print(f"Inserted {inserted_ratings} rating documents into {database_name}.ratings")
+        report_counts(db, counts, upsert)
+        client.close()
+    except ConnectionFailure as exc:
+        raise RuntimeError(f"Failed to connect to MongoDB: {exc}") from exc
 
-            ratings_collection.create_index("id")
-            print("Created index on ratings.id")
+    if failures:
+        raise RuntimeError(f"{len(failures)} write batches failed; first: {failures[0]}")
 
-            ratings_collection.create_index("user_id")
-            print("Created index on ratings.user_id")
 
-            ratings_collection.create_index("anime_id")
-            print("Created index on ratings.anime_id")
+def load_shard(
+    connection_string: str,
+    database_name: str,
+    users_path: Path,
+    ratings_path: Path,
+    upsert: bool,
+    batch_size: int,
+    workers: int,
+) -> tuple[dict[str, dict[str, int]], list[str]]:
+    """Write one shard's users and ratings files over a client of its own (worker process entry point)."""
+    client = connect(connection_string, workers)
+    try:
+        db = client[database_name]
+        counts, failures = write_parallel(
+            [
+                ("users", db["users"], load_documents(users_path, "Users")),
+                ("ratings", db["ratings"], load_documents(ratings_path, "Ratings")),
+            ],
+            batch_size=batch_size,
+            workers=workers,
+            show_progress=False,
+            upsert=upsert,
+        )
+    finally:
+        client.close()
+    return counts, [f"{users_path.name}/{ratings_path.name}: {failure}" for failure in failures]
 
-            ratings_collection.create_index("status")
-            print("Created index on ratings.status")
-        else:
-            print("No rating documents to insert.")
 
+def insert_shards(
+    connection_string: str,
+    database_name: str,
+    file_pairs: list[tuple[Path, Path]],
+    clear_collections: bool,
+    upsert: bool,
+    batch_size: int,
+    workers: int,
+    processes: int,
+    validation: str,
+    user_layout: str,
+    show_progress: bool,
+) -> None:
+    """Load the (users, ratings) file pairs of a sharded output from parallel worker processes.
+
+    Each process parses its own files and writes them with up to workers
+    concurrent batches, so JSON decoding is spread over processes as well as
+    the round trips. Clearing, validators and indexes are handled once here.
+    """
+    counts = {label: {"inserted": 0, "replaced": 0, "unchanged": 0} for label in ("users", "ratings")}
+    failures: list[str] = []
+    try:
+        client = connect(connection_string, workers)
+        db = client[database_name]
+        prepare_collections(db, clear_collections, upsert, validation, user_layout)
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(
+                    load_shard,
+                    connection_string,
+                    database_name,
+                    users_path,
+                    ratings_path,
+                    upsert,
+                    batch_size,
+                    workers,
+                )
+                for users_path, ratings_path in file_pairs
+            ]
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Loading shards",
+                unit="shard",
+                disable=not show_progress,
+            ):
+                shard_counts, shard_failures = future.result()
+                for label, label_counts in shard_counts.items():
+                    for key, value in label_counts.items():
+                        counts[label][key] += value
+                failures.extend(shard_failures)
+
+        report_counts(db, counts, upsert)
         client.close()
     except ConnectionFailure as exc:
         raise RuntimeError(f"Failed to connect to MongoDB: {exc}") from exc
-    except BulkWriteError as exc:
-        inserted = exc.details.get("nInserted", 0)
-        raise RuntimeError(f"Bulk write error after inserting {inserted} documents: {exc.details}") from exc
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} write batches failed; first: {failures[0]}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -140,27 +314,82 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--input-dir",
         default="dml/document-seeds",
-        help="Directory containing users.json and ratings.json.",
+        help=(
+            "Directory containing the generated documents. The files named in its manifest.json "
+            "are loaded (every shard of a --shards run), else users.json and ratings.json."
+        ),
     )
     parser.add_argument(
         "--users-file",
-        help="Optional explicit path to users JSON file. Overrides --input-dir/users.json",
+        help=(
+            "Optional explicit path to the users file (.json array or .ndjson, optionally .gz). "
+            "Overrides --input-dir."
+        ),
     )
     parser.add_argument(
         "--ratings-file",
-        help="Optional explicit path to ratings JSON file. Overrides --input-dir/ratings.json",
+        help=(
+            "Optional explicit path to the ratings file (.json array or .ndjson, optionally .gz). "
+            "Overrides --input-dir."
+        ),
     )
-    parser.add_argument(
+    write_mode = parser.add_mutually_exclusive_group()
+    write_mode.add_argument(
         "--clear",
         action="store_true",
         help="Delete existing users and ratings documents before insert.",
     )
+    write_mode.add_argument(
+        "--upsert",
+        action="store_true",
+        help=(
+            "Replace documents by id with bulk_write(ReplaceOne(upsert=True)) instead of inserting: "
+            "reruns are idempotent and the collections are never emptied. Documents no longer "
+            "generated are kept. Needs ratings generated with --rating-ids per-user."
+        ),
+    )
     parser.add_argument(
         "--batch-size",
         type=int,
         default=1000,
         help="Number of documents per insert batch (default: 1000).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Concurrent insert_many batches over the client connection pool; users and ratings "
+            "load at the same time (default: 1)."
+        ),
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help=(
+            "Worker processes loading the shards of a sharded --input-dir, each with its own "
+            "connection pool and --workers batches (default: one per shard, at most one per CPU)."
+        ),
+    )
+    parser.add_argument(
+        "--validation",
+        choices=("off", "warn", "error"),
+        default="off",
+        help=(
+            "Attach $jsonSchema validators built from schema/user_document.json and "
+            "schema/rating_document.json before inserting: warn logs invalid documents, "
+            "error rejects them (default: off)."
+        ),
+    )
+    parser.add_argument(
+        "--user-layout",
+        choices=tuple(USER_LAYOUT_SCHEMAS),
+        help=(
+            "Layout of the users documents, used to pick the --validation schema: reference "
+            "(rating ids) or embedded (rating summary). Defaults to the one in manifest.json, "
+            "else reference."
+        ),
+    )
     parser.add_argument(
         "--progress",
         choices=("linear", "detailed", "off"),
@@ -186,22 +415,71 @@ def main() -> None:
         connection_string = resolve_connection_string(args.connection_string)
         database_name = resolve_database_name()
 
-        input_dir = Path(args.input_dir)
-        users_path = Path(args.users_file) if args.users_file else input_dir / "users.json"
-        ratings_path = Path(args.ratings_file) if args.ratings_file else input_dir / "ratings.json"
-
-        users = load_json_array(users_path, "Users")
-        ratings = load_json_array(ratings_path, "Ratings")
-
-        insert_documents(
-            connection_string=connection_string,
-            database_name=database_name,
-            users=users,
-            ratings=ratings,
-            clear_collections=args.clear,
-            batch_size=max(1, args.batch_size),
-            show_progress=should_enable_tqdm(args.progress),
-        )
+        file_pairs = resolve_input_files(Path(args.input_dir))
+        user_layout = args.user_layout or resolve_user_layout(Path(args.input_dir))
+        if user_layout not in USER_LAYOUT_SCHEMAS:
+            raise ValueError(f"Unknown user_layout in manifest.json: {user_layout}")
+        if args.users_file or args.ratings_file:
+            if len(file_pairs) > 1 and not (args.users_file and args.ratings_file):
+                raise ValueError("Pass both --users-file and --ratings-file to override a sharded --input-dir.")
+            default_users_path, default_ratings_path = file_pairs[0]
+            file_pairs = [
+                (
+                    Path(args.users_file) if args.users_file else default_users_path,
+                    Path(args.ratings_file) if args.ratings_file else default_ratings_path,
+                )
+            ]
+
+        if args.upsert:
+            rating_ids = None if args.ratings_file else resolve_rating_ids(Path(args.input_dir))
+            if rating_ids == "sequential":
+                raise ValueError(
+                    "--upsert needs ratings generated with --rating-ids per-user: sequential ids shift "
+                    "when the set of users changes, so a rerun would replace unrelated ratings."
+                )
+            if rating_ids is None:
+                print(
+                    "Warning: cannot tell how the rating ids were generated; --upsert is only "
+                    "idempotent with generate_document_seeds.py --rating-ids per-user.",
+                    file=sys.stderr,
+                )
+
+        if len(file_pairs) > 1:
+            for users_path, ratings_path in file_pairs:
+                for path, label in ((users_path, "Users"), (ratings_path, "Ratings")):
+                    if not path.exists():
+                        raise FileNotFoundError(f"{label} file not found: {path}")
+            insert_shards(
+                connection_string=connection_string,
+                database_name=database_name,
+                file_pairs=file_pairs,
+                clear_collections=args.clear,
+                upsert=args.upsert,
+                batch_size=max(1, args.batch_size),
+                workers=max(1, args.workers),
+                processes=max(1, args.processes or min(len(file_pairs), os.cpu_count() or 1)),
+                validation=args.validation,
+                user_layout=user_layout,
+                show_progress=should_enable_tqdm(args.progress),
+            )
+        else:
+            users_path, ratings_path = file_pairs[0]
+            users = load_documents(users_path, "Users")
+            ratings = load_documents(ratings_path, "Ratings")
+
+            insert_documents(
+                connection_string=connection_string,
+                database_name=database_name,
+                users=users,
+                ratings=ratings,
+                clear_collections=args.clear,
+                upsert=args.upsert,
+                batch_size=max(1, args.batch_size),
+                workers=max(1, args.workers),
+                validation=args.validation,
+                user_layout=user_layout,
+                show_progress=should_enable_tqdm(args.progress),
+            )
 
         print("NoSQL load completed successfully.")
     except Exception as exc:
@@ -2,13 +2,33 @@ from __future__ import annotations
 
 import argparse
 import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import psycopg
+from psycopg import sql
 from tqdm import tqdm
 
 
+# Layout written by dml/seed_sql.py:write_copy_data().
+COPY_STATEMENT_RE = re.compile(r"COPY\s+(\w+)\s*\(([^)]*)\)\s+FROM\s+stdin;", re.IGNORECASE)
+CONFLICT_PREFIX = "-- On conflict:"
+CONFLICT_UPDATE_PREFIX = "-- On conflict update:"
+COPY_END_MARKER = b"\\.\n"
+COPY_CHUNK_BYTES = 1 << 20
+
+DDL_DIR = Path(__file__).resolve().parent / "ddl" / "tables"
+# ddl/tables/NNN_<table>.sql and dml/seeds/NNN_<table>_seed.{sql,copy}
+SQL_FILE_TABLE_RE = re.compile(r"\d+_(\w+?)(?:_seed)?\.(?:sql|copy)")
+CREATE_TABLE_RE = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+REFERENCES_RE = re.compile(r"REFERENCES\s+(\w+)", re.IGNORECASE)
+# Statements still to run after a --bulk-load; removed once every constraint is back.
+PENDING_CONSTRAINTS_NAME = "deferred_constraints.pending"
+
+
 def parse_args() -> argparse.Namespace:
 	parser = argparse.ArgumentParser(
 		description="Execute all SQL table scripts in ddl/tables against a Postgres database."
@@ -23,6 +43,38 @@ def parse_args() -> argparse.Namespace:
 		required=True,
 		help="Directory containing ordered .sql files.",
 	)
+	parser.add_argument(
+		"--format",
+		choices=("sql", "copy"),
+		default="sql",
+		help=(
+			"Which seed files to run: .sql scripts, or .copy data files written with --format copy "
+			"by the seed generators, loaded with COPY FROM STDIN (default: sql)."
+		),
+	)
+	parser.add_argument(
+		"--jobs",
+		type=int,
+		default=1,
+		help=(
+			"Number of database connections used to run independent files in parallel. Files are grouped "
+			"into dependency levels from the foreign keys in --ddl-dir; each level is committed only if all "
+			"of its files succeed (default: 1, every file in one transaction)."
+		),
+	)
+	parser.add_argument(
+		"--ddl-dir",
+		default=str(DDL_DIR),
+		help="Directory of CREATE TABLE scripts used to derive the --jobs dependency levels (default: ddl/tables).",
+	)
+	parser.add_argument(
+		"--bulk-load",
+		action="store_true",
+		help=(
+			"Drop the foreign keys (and, for --format copy, the primary keys) of the seeded tables, load "
+			"every file, then add the constraints back and ANALYZE. --format copy requires empty tables."
+		),
+	)
 	parser.add_argument(
 		"--progress",
 		choices=("linear", "detailed", "off"),
@@ -49,17 +101,34 @@ def resolve_connection_string(connection_string: str | None) -> str:
 	raise ValueError("Missing connection string. Pass it as an argument or set SQL_DATABASE_URL.")
 
 
-def get_sql_files(scripts_dir: Path) -> list[Path]:
+def get_sql_files(scripts_dir: Path, suffix: str = ".sql") -> list[Path]:
 	if not scripts_dir.exists() or not scripts_dir.is_dir():
 		raise FileNotFoundError(f"Scripts directory not found: {scripts_dir}")
 
-	sql_files = sorted(path for path in scripts_dir.iterdir() if path.suffix == ".sql")
+	sql_files = sorted(path for path in scripts_dir.iterdir() if path.suffix == suffix)
 	if not sql_files:
-		raise FileNotFoundError(f"No .sql files found in: {scripts_dir}")
+		raise FileNotFoundError(f"No {suffix} files found in: {scripts_dir}")
 	return sql_files
 
 
-def execute_sql_files(connection_string: str, sql_files: list[Path], show_progress: bool) -> None:
+def execute_sql_file(cursor: psycopg.Cursor, sql_file: Path, direct_copy: bool = False) -> None:
+	try:
+		if sql_file.suffix == ".copy":
+			load_copy_file(cursor, sql_file, direct=direct_copy)
+			return
+		script = sql_file.read_text(encoding="utf-8").strip()
+		if script:
+			cursor.execute(script)
+	except Exception as exc:
+		raise RuntimeError(f"Failed executing {sql_file.name}: {exc}") from exc
+
+
+def execute_sql_files(
+	connection_string: str,
+	sql_files: list[Path],
+	show_progress: bool,
+	direct_copy: bool = False,
+) -> None:
 	with psycopg.connect(connection_string) as connection:
 		with connection.cursor() as cursor:
 			for sql_file in tqdm(
@@ -68,16 +137,390 @@ def execute_sql_files(connection_string: str, sql_files: list[Path], show_progre
 				unit="file",
 				disable=not show_progress,
 			):
-				sql = sql_file.read_text(encoding="utf-8").strip()
-				if not sql:
-					continue
-				try:
-					cursor.execute(sql)
-				except Exception as exc:
-					raise RuntimeError(f"Failed executing {sql_file.name}: {exc}") from exc
+				execute_sql_file(cursor, sql_file, direct_copy)
 		connection.commit()
 
 
+def read_foreign_keys(ddl_dir: Path) -> dict[str, set[str]]:
+	"""Map every table created in ddl_dir to the tables its foreign keys reference."""
+	references: dict[str, set[str]] = {}
+	if not ddl_dir.is_dir():
+		return references
+	for ddl_file in sorted(ddl_dir.glob("*.sql")):
+		text = ddl_file.read_text(encoding="utf-8")
+		for statement in text.split(";"):
+			match = CREATE_TABLE_RE.search(statement)
+			if match:
+				table = match.group(1).lower()
+				references.setdefault(table, set()).update(
+					name.lower() for name in REFERENCES_RE.findall(statement) if name.lower() != table
+				)
+	return references
+
+
+def plan_levels(sql_files: list[Path], references: dict[str, set[str]]) -> list[list[Path]]:
+	"""Group ordered files into levels whose files do not depend on each other.
+
+	A file depends on the earlier files for the tables its table references
+	and for its own table. A file whose table is not found in the DDL keeps
+	the plain numeric order: it runs alone, after every earlier file and
+	before every later one.
+	"""
+	table_levels: dict[str, int] = {}
+	file_levels: list[int] = []
+	floor = 0
+	for sql_file in sql_files:
+		match = SQL_FILE_TABLE_RE.fullmatch(sql_file.name)
+		table = match.group(1).lower() if match else None
+		if table is None or table not in references:
+			level = max(file_levels, default=-1) + 1
+			floor = level + 1
+		else:
+			parents = [table_levels[name] for name in (references[table] | {table}) if name in table_levels]
+			level = max([floor, *(parent + 1 for parent in parents)])
+			table_levels[table] = level
+		file_levels.append(level)
+
+	levels: dict[int, list[Path]] = {}
+	for sql_file, level in zip(sql_files, file_levels):
+		levels.setdefault(level, []).append(sql_file)
+	return [levels[level] for level in sorted(levels)]
+
+
+def execute_sql_levels(
+	connection_string: str,
+	levels: list[list[Path]],
+	jobs: int,
+	show_progress: bool,
+	direct_copy: bool = False,
+) -> None:
+	"""Run each level's files in parallel over up to jobs connections.
+
+	Every connection keeps its share of a level in one open transaction. The
+	level is committed only once all of its files succeeded; otherwise every
+	connection rolls back and the error is raised, leaving the earlier levels
+	committed.
+	"""
+	pool_size = max(1, min(jobs, max(len(level) for level in levels)))
+	connections: list[psycopg.Connection] = []
+	failed = threading.Event()
+
+	def run_share(connection: psycopg.Connection, share: list[Path], progress_bar: tqdm) -> None:
+		with connection.cursor() as cursor:
+			for sql_file in share:
+				if failed.is_set():
+					return
+				try:
+					execute_sql_file(cursor, sql_file, direct_copy)
+				except RuntimeError:
+					failed.set()
+					raise
+				progress_bar.update(1)
+
+	try:
+		# Opened inside the try so a failed connect still closes the earlier ones.
+		for _ in range(pool_size):
+			connections.append(psycopg.connect(connection_string))
+		with ThreadPoolExecutor(max_workers=pool_size) as executor, tqdm(
+			total=sum(len(level) for level in levels),
+			desc="Executing SQL files",
+			unit="file",
+			disable=not show_progress,
+		) as progress_bar:
+			for level_number, level in enumerate(levels, start=1):
+				# Largest files first, each to the least loaded connection.
+				shares: list[list[Path]] = [[] for _ in connections]
+				loads = [0] * len(connections)
+				for sql_file in sorted(level, key=lambda path: path.stat().st_size, reverse=True):
+					index = loads.index(min(loads))
+					shares[index].append(sql_file)
+					loads[index] += sql_file.stat().st_size
+				active = [(connection, share) for connection, share in zip(connections, shares) if share]
+
+				futures = [executor.submit(run_share, connection, share, progress_bar) for connection, share in active]
+				errors = []
+				for future in futures:
+					try:
+						future.result()
+					except RuntimeError as exc:
+						errors.append(exc)
+				if errors:
+					for connection, _share in active:
+						connection.rollback()
+					raise RuntimeError(f"Level {level_number} rolled back: {errors[0]}") from errors[0]
+				for connection, _share in active:
+					connection.commit()
+	finally:
+		for connection in connections:
+			connection.close()
+
+
+def load_copy_file(cursor: psycopg.Cursor, copy_file: Path, direct: bool = False) -> None:
+	"""Stream a .copy seed file into its table, skipping (or, for delta seeds, updating) existing rows.
+
+	The rows are copied into a temporary staging table first and then moved
+	with INSERT ... SELECT ... ON CONFLICT DO NOTHING, which keeps the
+	idempotent behaviour of the INSERT seed files. With direct=True (bulk
+	load into empty tables without keys) they are copied into the table itself.
+	"""
+	conflict_columns: list[str] = []
+	update_columns: list[str] = []
+	with copy_file.open("rb") as handle:
+		for raw_line in handle:
+			line = raw_line.decode("utf-8").strip()
+			if line.startswith(CONFLICT_UPDATE_PREFIX):
+				update_columns = [name.strip() for name in line[len(CONFLICT_UPDATE_PREFIX):].split(",") if name.strip()]
+				continue
+			if line.startswith(CONFLICT_PREFIX):
+				conflict_columns = [name.strip() for name in line[len(CONFLICT_PREFIX):].split(",") if name.strip()]
+				continue
+			match = COPY_STATEMENT_RE.fullmatch(line)
+			if match:
+				break
+		else:
+			return  # header only: the generator found no rows for this table
+
+		table = sql.Identifier(match.group(1))
+		staging = table if direct else sql.Identifier(f"{match.group(1)}_staging")
+		columns = sql.SQL(", ").join(sql.Identifier(name.strip()) for name in match.group(2).split(","))
+
+		if not direct:
+			cursor.execute(sql.SQL("CREATE TEMPORARY TABLE {} (LIKE {} INCLUDING DEFAULTS)").format(staging, table))
+		with cursor.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(staging, columns)) as copy:
+			chunk: list[bytes] = []
+			chunk_size = 0
+			for raw_line in handle:
+				if raw_line == COPY_END_MARKER:
+					break
+				chunk.append(raw_line)
+				chunk_size += len(raw_line)
+				if chunk_size >= COPY_CHUNK_BYTES:
+					copy.write(b"".join(chunk))
+					chunk.clear()
+					chunk_size = 0
+			if chunk:
+				copy.write(b"".join(chunk))
+
+	if direct:
+		return
+	if conflict_columns and update_columns:
+		conflict = sql.SQL("ON CONFLICT ({}) DO UPDATE SET {}").format(
+			sql.SQL(", ").join(sql.Identifier(name) for name in conflict_columns),
+			sql.SQL(", ").join(
+				sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(name), sql.Identifier(name)) for name in update_columns
+			),
+		)
+	elif conflict_columns:
+		conflict = sql.SQL("ON CONFLICT ({}) DO NOTHING").format(
+			sql.SQL(", ").join(sql.Identifier(name) for name in conflict_columns)
+		)
+	else:
+		conflict = sql.SQL("ON CONFLICT DO NOTHING")
+	cursor.execute(
+		sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} {}").format(table, columns, columns, staging, conflict)
+	)
+	cursor.execute(sql.SQL("DROP TABLE {}").format(staging))
+
+
+def seeded_tables(sql_files: list[Path]) -> list[str]:
+	tables: list[str] = []
+	for sql_file in sql_files:
+		match = SQL_FILE_TABLE_RE.fullmatch(sql_file.name)
+		if match and match.group(1) not in tables:
+			tables.append(match.group(1))
+	return tables
+
+
+def fetch_deferrable_constraints(
+	cursor: psycopg.Cursor,
+	tables: list[str],
+	include_primary_keys: bool,
+) -> list[tuple[str, str, str, str]]:
+	"""Return (table, name, type, definition) of the keys a bulk load of tables may drop.
+
+	Foreign keys are returned when they start or end at one of the tables, so
+	the referenced primary keys can be dropped as well. Table names come back
+	from regclass and are already quoted where needed.
+	"""
+	cursor.execute(
+		"""
+		SELECT c.conrelid::regclass::text, c.conname, c.contype, pg_get_constraintdef(c.oid)
+		FROM pg_constraint AS c
+		JOIN unnest(%(tables)s::text[]) AS t(name) ON to_regclass(t.name) IS NOT NULL
+		WHERE (c.contype = 'f' AND to_regclass(t.name) IN (c.conrelid, c.confrelid))
+		   OR (%(primary_keys)s AND c.contype = 'p' AND c.conrelid = to_regclass(t.name))
+		GROUP BY c.oid, c.conrelid, c.conname, c.contype
+		ORDER BY c.contype, 1, 2
+		""",
+		{"tables": tables, "primary_keys": include_primary_keys},
+	)
+	return [(row[0], row[1], row[2], row[3]) for row in cursor.fetchall()]
+
+
+def add_constraint_sql(table: str, name: str, definition: str) -> str:
+	return sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+		sql.SQL(table), sql.Identifier(name), sql.SQL(definition)
+	).as_string(None)
+
+
+def describe_violation(exc: Exception) -> str:
+	diag = getattr(exc, "diag", None)
+	if diag is not None and diag.message_primary:
+		detail = f" ({diag.message_detail})" if diag.message_detail else ""
+		return f"{diag.message_primary}{detail}"
+	return str(exc)
+
+
+def run_statements_in_parallel(
+	connection_string: str,
+	groups: list[list[tuple[str, str]]],
+	jobs: int,
+) -> list[tuple[str, str, str]]:
+	"""Run groups of (label, statement) tasks on up to jobs autocommit connections.
+
+	The statements of a group run in order on one connection; the groups run
+	in parallel. Returns (label, statement, error) for every statement that
+	failed.
+	"""
+	failures: list[tuple[str, str, str]] = []
+
+	def run_group(group: list[tuple[str, str]]) -> None:
+		with psycopg.connect(connection_string, autocommit=True) as connection:
+			for label, statement in group:
+				try:
+					connection.execute(statement)
+				except psycopg.Error as exc:
+					failures.append((label, statement, describe_violation(exc)))
+
+	with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+		for future in [executor.submit(run_group, group) for group in groups if group]:
+			future.result()
+	return failures
+
+
+def bulk_load(
+	connection_string: str,
+	sql_files: list[Path],
+	scripts_dir: Path,
+	jobs: int,
+	show_progress: bool,
+) -> None:
+	"""Load sql_files with the foreign (and for .copy, primary) keys dropped, then rebuild them.
+
+	Without foreign keys the files no longer depend on each other, so with
+	jobs > 1 they all run as a single parallel level. The keys are then added
+	back: primary keys in parallel, one table per connection, then the foreign
+	keys as NOT VALID (a quick catalog change) and finally their validation
+	scans. VALIDATE CONSTRAINT takes SHARE UPDATE EXCLUSIVE on the child
+	table, which conflicts with itself, so the validations of one table run
+	one after another on a single connection and only different tables are
+	validated in parallel. Every violation is reported and the statements
+	that failed are left in deferred_constraints.pending.
+	"""
+	pending_path = scripts_dir / PENDING_CONSTRAINTS_NAME
+	if pending_path.exists():
+		raise RuntimeError(
+			f"A previous bulk load did not restore all constraints. Apply {pending_path} and delete it first."
+		)
+
+	direct_copy = all(sql_file.suffix == ".copy" for sql_file in sql_files)
+	tables = seeded_tables(sql_files)
+	with psycopg.connect(connection_string) as connection:
+		with connection.cursor() as cursor:
+			if direct_copy:
+				for table in tables:
+					cursor.execute(
+						sql.SQL("SELECT EXISTS (SELECT 1 FROM {})").format(sql.Identifier(table))
+					)
+					if cursor.fetchone()[0]:
+						raise RuntimeError(f"--bulk-load --format copy needs empty tables; {table} already has rows.")
+			constraints = fetch_deferrable_constraints(cursor, tables, include_primary_keys=direct_copy)
+			# Foreign keys come first in the list and must go before the keys they reference.
+			for table, name, _, _ in constraints:
+				cursor.execute(
+					sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.SQL(table), sql.Identifier(name))
+				)
+		# Saved before the drop is committed so an interrupted run can still be repaired.
+		pending_path.write_text(
+			"".join(f"{add_constraint_sql(table, name, definition)};\n" for table, name, _, definition in constraints),
+			encoding="utf-8",
+		)
+		try:
+			connection.commit()
+		except psycopg.Error:
+			pending_path.unlink()
+			raise
+	print(f"Dropped {len(constraints)} constraint(s) for the bulk load.")
+
+	load_error: RuntimeError | None = None
+	try:
+		if jobs > 1:
+			execute_sql_levels(connection_string, [sql_files], jobs, show_progress, direct_copy)
+		else:
+			execute_sql_files(connection_string, sql_files, show_progress, direct_copy)
+	except RuntimeError as exc:
+		load_error = exc
+
+	primary_keys = [item for item in constraints if item[2] == "p"]
+	foreign_keys = [item for item in constraints if item[2] == "f"]
+	failures = run_statements_in_parallel(
+		connection_string,
+		[
+			[(f"{name} on {table}", add_constraint_sql(table, name, definition))]
+			for table, name, _, definition in primary_keys
+		],
+		jobs,
+	)
+	failures += run_statements_in_parallel(
+		connection_string,
+		[
+			[
+				(f"{name} on {table}", add_constraint_sql(table, name, f"{definition} NOT VALID"))
+				for table, name, _, definition in foreign_keys
+			]
+		],
+		1,
+	)
+	failed_adds = {label for label, _, _ in failures}
+	validations: dict[str, list[tuple[str, str]]] = {}
+	for table, name, _, _ in foreign_keys:
+		if f"{name} on {table}" in failed_adds:
+			continue
+		validations.setdefault(table, []).append(
+			(
+				f"{name} on {table}",
+				sql.SQL("ALTER TABLE {} VALIDATE CONSTRAINT {}")
+				.format(sql.SQL(table), sql.Identifier(name))
+				.as_string(None),
+			)
+		)
+	failures += run_statements_in_parallel(connection_string, list(validations.values()), jobs)
+
+	if failures:
+		pending_path.write_text("".join(f"{statement};\n" for _, statement, _ in failures), encoding="utf-8")
+	else:
+		pending_path.unlink()
+	if load_error is not None:
+		raise load_error
+	if failures:
+		messages = "\n".join(f"- {label}: {error}" for label, _, error in failures)
+		raise RuntimeError(
+			f"Bulk load finished but {len(failures)} constraint(s) could not be restored:\n{messages}\n"
+			f"Fix the data, then apply the statements left in {pending_path} and delete it."
+		)
+	print(f"Restored {len(constraints)} constraint(s).")
+
+	failures = run_statements_in_parallel(
+		connection_string,
+		[[(table, sql.SQL("ANALYZE {}").format(sql.Identifier(table)).as_string(None))] for table in tables],
+		jobs,
+	)
+	if failures:
+		label, _, error = failures[0]
+		raise RuntimeError(f"ANALYZE {label} failed: {error}")
+	print(f"Analyzed {len(tables)} table(s).")
+
+
 def load_env_variables() -> None:
     env_path = Path(__file__).resolve().parent / ".env.local"
     if env_path.exists():
@@ -94,8 +537,17 @@ def main() -> None:
 	args = parse_args()
 	load_env_variables()
 	connection_string = resolve_connection_string(args.connection_string)
-	sql_files = get_sql_files(Path(args.scripts_dir))
-	execute_sql_files(connection_string, sql_files, show_progress=should_enable_tqdm(args.progress))
+	sql_files = get_sql_files(Path(args.scripts_dir), suffix=f".{args.format}")
+	show_progress = should_enable_tqdm(args.progress)
+	if args.bulk_load:
+		bulk_load(connection_string, sql_files, Path(args.scripts_dir), args.jobs, show_progress)
+	elif args.jobs > 1:
+		levels = plan_levels(sql_files, read_foreign_keys(Path(args.ddl_dir)))
+		for level_number, level in enumerate(levels, start=1):
+			print(f"Level {level_number}: {', '.join(path.name for path in level)}")
+		execute_sql_levels(connection_string, levels, args.jobs, show_progress)
+	else:
+		execute_sql_files(connection_string, sql_files, show_progress)
 	print(f"Executed {len(sql_files)} SQL file(s) successfully.")
 
 
@@ -6,5 +6,8 @@ pkgs.mkShell {
 		python3Packages.tqdm
 		python3Packages.psycopg
 		python3Packages.pymongo
+		python3Packages.pyarrow
+		python3Packages.numpy
+		python3Packages.pandas
 	];
 }